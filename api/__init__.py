@@ -1,4 +1,4 @@
-import os
+import os, logging
 from flask import Flask
 from sqlalchemy.exc import DBAPIError
 from api.extensions import migrate, jwt, db, cors
@@ -7,9 +7,22 @@ from api.utils.exceptions import APIException
 
 from api.utils.responses import JSONResponse
 from api.services.redis_service import RedisClient
+from api.services.cache_service import LocalLRU, PublicInfoCache, init_public_info_cache
+from api.monitoring.queries import QueryCounter
+from api.monitoring.pool import PoolMonitor, warm_pool
+from api.monitoring.slow_queries import SlowQueryLog
+from api.monitoring.timing import RequestTimer, span
+from api.monitoring.metrics import Metrics
+from api.monitoring.profiler import RequestProfiler
+from api.monitoring.memory import MemoryTracker
+from api.monitoring.logs import LogPipeline
+from api.commands import init_commands
+from api.jobs import JobRunner
 
 # blueprints
-from api.blueprints import auth, user, company
+from api.blueprints import auth, user, company, admin, batch, sync
+
+logger = logging.getLogger(__name__)
 
 
 def create_app(test_config=None):
@@ -17,6 +30,8 @@ def create_app(test_config=None):
     if test_config is None:
         app.config.from_object(os.environ["API_SETTINGS"])
 
+    LogPipeline(app)
+
     # API_ERROR_HANDLERS
     app.register_error_handler(HTTPException, handle_http_error)
     app.register_error_handler(APIException, handle_API_Exception)
@@ -28,8 +43,18 @@ def create_app(test_config=None):
     migrate.init_app(
         app, db, directory=os.path.join(os.path.dirname(__file__), "migrations")
     )
+    init_commands(app)
     jwt.init_app(app)
     cors.init_app(app)
+    init_public_info_cache(app)
+    QueryCounter(app)
+    PoolMonitor(app)
+    SlowQueryLog(app)
+    RequestTimer(app)
+    Metrics(app)
+    RequestProfiler(app)
+    MemoryTracker(app)
+    JobRunner(app)
 
     # with app.app_context():
     #     db.create_all() #creates all tables in the database, if does not exists.
@@ -39,14 +64,37 @@ def create_app(test_config=None):
     app.register_blueprint(auth.auth_bp, url_prefix="/auth")
     app.register_blueprint(user.user_bp, url_prefix="/user")
     app.register_blueprint(company.company_bp, url_prefix="/company")
+    app.register_blueprint(admin.admin_bp, url_prefix="/admin")
+    app.register_blueprint(sync.sync_bp, url_prefix="/sync")
+    app.register_blueprint(admin.metrics_bp)
+    app.register_blueprint(batch.batch_bp)
     return app
 
 
+def reinit_after_fork(app) -> None:
+    """
+    resets the state a worker inherits when the app is built before fork (gunicorn --preload):
+    pooled connections, the log listener thread, background executors and worker local caches.
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)  # connections are shared with the master, don't close them here
+        if app.config.get("DB_POOL_WARMUP"):
+            warm_pool(db.engine, app.config["DB_POOL_WARMUP"])
+
+    app.extensions["log_pipeline"].restart()
+    if "slow_query_log" in app.extensions:
+        app.extensions["slow_query_log"].after_fork()
+
+    local = PublicInfoCache.local
+    PublicInfoCache.local = LocalLRU(maxsize=local.maxsize, ttl=local.ttl)
+
+
 def handle_DBAPI_disconnect(e):
+    db.session.rollback()  # connection is invalidated by the pool, session must be reset
     resp = JSONResponse(
         **JSONResponse.service_unavailable()
     )
-    print(f"DBAPI_disconnect: {e}")
+    logger.error("DBAPI_disconnect: %s", e, extra={"data": {"event": "dbapi_error"}})
     return resp.to_json()
 
 
@@ -70,7 +118,8 @@ def handle_API_Exception(exception: APIException):
 def check_if_token_revoked(jwt_header, jwt_payload) -> bool:
     jti = jwt_payload["jti"]
     rdb = RedisClient().set_connection()
-    token_in_redis = rdb.get(jti)
+    with span("redis"):
+        token_in_redis = rdb.get(jti)
 
     return token_in_redis is not None
 
@@ -84,7 +133,7 @@ def expired_token_msg(jwt_header, jwt_payload):
         "jwt_id": jwt_payload["sub"],
     }
     rsp = JSONResponse(**JSONResponse.unauthorized())
-    print(data)
+    logger.info("jwt revoked or expired", extra={"data": data, "sample_key": "jwt_expired"})
     return rsp.to_json()
 
 
@@ -92,5 +141,5 @@ def expired_token_msg(jwt_header, jwt_payload):
 @jwt.unauthorized_loader
 def invalid_token_msg(error):
     rsp = JSONResponse(**JSONResponse.unauthorized())
-    print({"jwt": error})
+    logger.info("invalid jwt", extra={"data": {"jwt": error}, "sample_key": "jwt_invalid"})
     return rsp.to_json()
@@ -0,0 +1,41 @@
+from flask import Blueprint, Response, current_app
+from api.utils.responses import JSONResponse
+from api.utils.exceptions import APIException
+from api.utils.decorators import admin_token_required
+
+
+admin_bp = Blueprint("admin_bp", __name__)
+metrics_bp = Blueprint("metrics_bp", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+@admin_token_required()
+def get_metrics():
+    """metrics of all the workers, in prometheus text format"""
+    metrics = current_app.extensions.get("metrics")
+    if metrics is None:
+        raise APIException.from_response(JSONResponse.not_found())
+
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+@admin_bp.route("/slow-queries", methods=["GET"])
+@admin_token_required()
+def get_slow_queries():
+    """statements recorded by the slow query log"""
+    slow_query_log = current_app.extensions.get("slow_query_log")
+    if slow_query_log is None:
+        raise APIException.from_response(JSONResponse.not_found())
+
+    return JSONResponse(data={"slow_queries": slow_query_log.serialize()}).to_json()
+
+
+@admin_bp.route("/memory", methods=["GET"])
+@admin_token_required()
+def get_memory_stats():
+    """memory allocations per endpoint, of the worker serving the request"""
+    memory_tracker = current_app.extensions.get("memory_tracker")
+    if memory_tracker is None:
+        raise APIException.from_response(JSONResponse.not_found())
+
+    return JSONResponse(data={"memory": memory_tracker.serialize()}).to_json()
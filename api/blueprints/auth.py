@@ -14,9 +14,14 @@ from api.utils.decorators import (
     user_required,
     verification_token_required,
     verified_token_required,
+    idempotent,
 )
 from api.services.email_service import Email_api_service as Email
 from api.services.redis_service import RedisClient as Redis
+from api.services.cache_service import PublicInfoCache
+from api.services import changefeed_service as feed
+from api.monitoring.queries import query_budget
+from api.monitoring.timing import span
 from api.extensions import db
 from api.models.main import Company, Role, User
 from sqlalchemy.exc import SQLAlchemyError
@@ -28,6 +33,7 @@ auth_bp = Blueprint("auth_bp", __name__)
 
 
 @auth_bp.route("/user-public-info", methods=["GET"])
+@query_budget(2)
 @json_required()
 def get_user_public():
     """Public Endpoint"""
@@ -41,11 +47,20 @@ def get_user_public():
     if not valid:
         raise APIException.from_response(JSONResponse.bad_request())
 
-    user = User.filter_user_by_email(email=h.normalize_string(email))
-    if not user or not user.signup_completed:
+    normalized_email = h.normalize_string(email)
+    cache = PublicInfoCache()
+    found, user_public = cache.get(normalized_email)
+    if not found:
+        user = User.filter_user_by_email(email=normalized_email)
+        user_public = (
+            user.serialize_public_info() if user and user.signup_completed else None
+        )
+        cache.set(normalized_email, user_public)  # None is cached as negative result
+
+    if user_public is None:
         raise APIException.from_response(JSONResponse.not_found())
 
-    return JSONResponse(data={"user_public": user.serialize_public_info()}).to_json()
+    return JSONResponse(data={"user_public": user_public}).to_json()
 
 
 @auth_bp.route("/email-validation", methods=["GET"])
@@ -127,6 +142,7 @@ def validate_verification_code(claims, body):
 
 
 @auth_bp.route("/signup", methods=["POST"])
+@idempotent()
 @verified_token_required()
 @json_required(
     schema={
@@ -170,6 +186,7 @@ def signup_user(body, claims):
 
         try:
             update_database_object(user, new_records)
+            feed.record_user(user)  # invited placeholder, shown in the members list of its companies
             db.session.commit()
         except SQLAlchemyError as e:
             handle_db_error(e)
@@ -280,7 +297,9 @@ def login_user(body):
     if not user.is_enabled:
         raise APIException.from_response(JSONResponse.user_not_active())
 
-    if not check_password_hash(user.password, password):
+    with span("password_hash"):
+        valid_password = check_password_hash(user.password, password)
+    if not valid_password:
         raise APIException.from_response(JSONResponse.wrong_password())
 
     response = {
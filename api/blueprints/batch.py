@@ -0,0 +1,118 @@
+import json, logging, time
+from flask import Blueprint, current_app, g, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from werkzeug.test import EnvironBuilder
+from api.extensions import db
+from api.utils.responses import JSONResponse
+from api.utils.decorators import json_required
+from api.monitoring.queries import query_budget
+
+logger = logging.getLogger(__name__)
+
+batch_bp = Blueprint("batch_bp", __name__)
+
+
+@batch_bp.route("/batch", methods=["POST"])
+@query_budget(30)
+@json_required(
+    schema={
+        "type": "object",
+        "properties": {
+            "requests": {
+                "type": "array",
+                "minItems": 1,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "method": {"type": "string", "enum": ["GET"]},
+                        "path": {"type": "string", "pattern": "^/"},
+                    },
+                    "required": ["path"],
+                    "additionalProperties": False,
+                },
+            }
+        },
+        "required": ["requests"],
+        "additionalProperties": False,
+    }
+)
+def run_batch(body):
+    """
+    runs several GET requests of the api in one round trip, e.g. the spa startup:
+    {"requests": [{"id": "user", "path": "/user/"}, {"id": "companies", "path": "/user/companies?status=pending"}]}
+    the jwt is optional (public endpoints), when present it is verified once and the user/role
+    lookups of the decorators are shared by all the sub-requests. results come back in order,
+    each one with its own status and body. sub-requests that would start after
+    BATCH_TIMEOUT seconds are not run and answer 504.
+    """
+    items = body["requests"]
+    max_requests = current_app.config.get("BATCH_MAX_REQUESTS", 10)
+    if len(items) > max_requests:
+        return JSONResponse(
+            **JSONResponse.bad_request(), data={"requests": f"max {max_requests} requests per batch"}
+        ).to_json()
+
+    verify_jwt_in_request(optional=True)
+    g.batch_claims = get_jwt() or None  # without a jwt, protected sub-requests answer 401 themselves
+    g.batch_identities = {}
+    deadline = time.monotonic() + current_app.config.get("BATCH_TIMEOUT", 10)
+    try:
+        responses = []
+        for index, item in enumerate(items):
+            if time.monotonic() > deadline:
+                responses.append({
+                    "id": item.get("id", str(index)),
+                    "status": 504,
+                    "body": {"message": "batch time limit reached, request not run"},
+                })
+                continue
+            responses.append(_dispatch(item, index))
+    finally:
+        g.pop("batch_claims", None)
+        g.pop("batch_identities", None)
+
+    return JSONResponse(data={"responses": responses}).to_json()
+
+
+def _dispatch(item: dict, index: int) -> dict:
+    """
+    runs the view of a sub-request in a nested request context. the request hooks (timing,
+    metrics, query counter, request id) are not run again, the batch is one request for them.
+    """
+    path = item["path"]
+    if path.startswith(request.script_root + "/"):
+        path = path[len(request.script_root):]  # "/api/user/" and "/user/" are the same
+
+    builder = EnvironBuilder(
+        path=path,
+        method=item.get("method", "GET"),
+        base_url=request.host_url.rstrip("/") + request.script_root,
+        headers={"Authorization": request.headers.get("Authorization", "")},
+        json={},  # json_required checks the content type
+    )
+    with current_app.request_context(builder.get_environ()):
+        try:
+            rv = current_app.dispatch_request()  # GET only, so /batch itself answers 405
+        except Exception as e:
+            db.session.rollback()
+            try:
+                rv = current_app.handle_user_exception(e)
+            except Exception:
+                logger.exception("batch sub-request failed: %s", path)
+                rv = JSONResponse(message="internal server error", status_code=500).to_json()
+
+        response = current_app.make_response(rv)
+
+    if response.is_streamed or response.mimetype == "text/event-stream":
+        response.close()  # the stream would hold the batch (and the worker) until it ends
+        response = current_app.make_response(JSONResponse(
+            **JSONResponse.bad_request(), data={"path": "streaming endpoints are not allowed in a batch"}
+        ).to_json())
+
+    try:
+        response_body = json.loads(response.get_data())
+    except ValueError:
+        response_body = response.get_data(as_text=True)
+
+    return {"id": item.get("id", str(index)), "status": response.status_code, "body": response_body}
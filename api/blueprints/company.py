@@ -1,3 +1,4 @@
+from datetime import datetime
 from flask import Blueprint, request
 from api.utils import helpers as h
 from api.utils.responses import JSONResponse
@@ -8,9 +9,12 @@ from api.utils.db_operations import (
     Unaccent,
     update_database_object,
 )
-from api.utils.decorators import json_required, role_required
-from api.utils.enums import AccessLevel
+from api.utils.decorators import json_required, role_required, idempotent, coalesce
+from api.utils.enums import AccessLevel, OperationStatus
 from api.services.email_service import Email_api_service as ems
+from api.services.events_service import EventBus, sse_response
+from api.services import changefeed_service as feed
+from api.monitoring.queries import query_budget
 from api.extensions import db
 from api.models.main import Company, Role, User
 from api.models.global_models import RoleFunction
@@ -24,6 +28,7 @@ company_bp = Blueprint("company_bp", __name__)
 @company_bp.route("/", methods=["GET"])
 @role_required()
 @json_required()
+@coalesce()
 def get_company(role):
     return JSONResponse(data=role.company.serialize_all()).to_json()
 
@@ -60,6 +65,7 @@ def update_company(role, body):
 
     try:
         update_database_object(role.company, new_records)
+        feed.record_company(role.company)
         db.session.commit()
     except SQLAlchemyError as e:
         handle_db_error(e)
@@ -70,8 +76,10 @@ def update_company(role, body):
 
 
 @company_bp.route("/users", methods=["GET"])
+@query_budget(3)
 @role_required(level=AccessLevel.ADMIN.value)
 @json_required()
+@coalesce()
 def get_company_users(role):
     qp = h.QueryParams(request.args)
     status = qp.get_first_value("status")
@@ -81,7 +89,7 @@ def get_company_users(role):
         db.session.query(Role).join(Role.company).filter(Company.id == role.company.id)
     )
     # filter 1
-    if status:  # ["accepted", "rejected", "pending"]
+    if status:  # ["accepted", "rejected", "pending", "expired"]
         base_q = base_q.filter(Role._inv_status == status)
 
     all_roles = base_q.paginate(**pg_params)
@@ -100,7 +108,15 @@ def get_company_users(role):
     ).to_json()
 
 
+@company_bp.route("/events", methods=["GET"])
+@role_required(level=AccessLevel.ADMIN.value)
+def get_company_events(role):
+    """server-sent events of the company invitations and members, for admins"""
+    return sse_response([EventBus.company_channel(role.company_id)])
+
+
 @company_bp.route("/users/invitation", methods=["POST"])
+@idempotent()
 @role_required(level=AccessLevel.ADMIN.value)
 @json_required({"email": str, "role_function_id": int})
 def invite_user(role, body):
@@ -153,21 +169,21 @@ def invite_user(role, body):
                 role_function=target_role_function,
             )
             db.session.add_all(instances=[new_user, new_role])
+            feed.record_role(new_role)
             db.session.commit()
         except SQLAlchemyError as e:
             handle_db_error(e)
 
+        _publish_role_event("invitation_created", new_role)
         return JSONResponse("new user invited", status_code=201).to_json()
 
     # if user exists
-    rel_exists = (
-        db.session.query(User.id)
-        .join(User.roles)
-        .join(Role.company)
-        .filter(User.id == target_user.id, Company.id == role.company.id)
+    existing_role = (
+        db.session.query(Role)
+        .filter(Role.user_id == target_user.id, Role.company_id == role.company.id)
         .first()
     )
-    if rel_exists:
+    if existing_role and existing_role.inv_status != OperationStatus.EXPIRED.value:
         raise APIException.from_response(JSONResponse.conflict({"email": email.value}))
 
     success, msg = ems.user_invitation(
@@ -179,16 +195,24 @@ def invite_user(role, body):
         raise APIException.from_response(JSONResponse.service_unavailable(msg))
 
     try:
-        new_role = Role(
-            company_id=role.company.id,
-            user=target_user,
-            role_function=target_role_function,
-        )
-        db.session.add(new_role)
+        if existing_role:  # expired invitation, sent again
+            new_role = existing_role
+            new_role.inv_status = OperationStatus.PENDING.value
+            new_role._relation_date = datetime.utcnow()
+            new_role.role_function = target_role_function
+        else:
+            new_role = Role(
+                company_id=role.company.id,
+                user=target_user,
+                role_function=target_role_function,
+            )
+            db.session.add(new_role)
+        feed.record_role(new_role)
         db.session.commit()
     except SQLAlchemyError as e:
         handle_db_error(e)
 
+    _publish_role_event("invitation_created", new_role)
     return JSONResponse("new user has been invited").to_json()
 
 
@@ -241,11 +265,13 @@ def update_user_role(role, body: dict, user_id: int):
 
     try:
         update_database_object(target_role, new_records=new_records)
+        feed.record_role(target_role)
         db.session.commit()
 
     except SQLAlchemyError as e:
         handle_db_error(e)
 
+    _publish_role_event("role_updated", target_role)
     return JSONResponse(message="role updated", data=target_role.serialize()).to_json()
 
 
@@ -272,7 +298,9 @@ def delete_user_from_company(role, user_id):
             JSONResponse.unauthorized({"role": "invalid role access-level"})
         )
 
+    event = _role_event_data(target_role)  # the row is gone after commit
     try:
+        feed.record_role(target_role, op="delete")  # tombstone
         db.session.delete(target_role)
         db.session.commit()
 
@@ -282,4 +310,21 @@ def delete_user_from_company(role, user_id):
     except SQLAlchemyError as e:
         handle_db_error(e)
 
+    EventBus.publish("role_deleted", event, user_id=event["user_id"], company_id=event["company_id"])
     return JSONResponse("Role has been deleted").to_json()
+
+
+def _role_event_data(role: Role) -> dict:
+    return {
+        "role_id": role.id,
+        "user_id": role.user_id,
+        "company_id": role.company_id,
+        "status": role.inv_status,
+        "is_active": role._is_active,
+    }
+
+
+def _publish_role_event(event: str, role: Role) -> None:
+    """notifies the user of the role and the company admins, call it after the commit"""
+    data = _role_event_data(role)
+    EventBus.publish(event, data, user_id=data["user_id"], company_id=data["company_id"])
@@ -0,0 +1,42 @@
+from flask import Blueprint, current_app, request
+from flask_jwt_extended import get_jwt
+from api.utils import helpers as h
+from api.utils.responses import JSONResponse
+from api.utils.decorators import json_required, user_required
+from api.utils.enums import AccessLevel
+from api.services import changefeed_service as feed
+from api.monitoring.queries import query_budget
+from api.extensions import db
+from api.models.main import Role
+
+sync_bp = Blueprint("sync_bp", __name__)
+
+
+@sync_bp.route("/", methods=["GET"])
+@query_budget(8)
+@user_required()
+@json_required()
+def get_changes(user):
+    """
+    changes since the 'since' cursor (0 or missing: from the start of the feed).
+    with a role token of an admin, the changes of the company members are included.
+    repeat with the returned cursor while has_more is true.
+    """
+    since = max(h.convert_str_to_int(request.args.get("since", "0")), 0)
+
+    company_id = None
+    claims = get_jwt()
+    if claims.get("role_access_token"):
+        role = db.session.get(Role, claims.get("role_id"))
+        if role is not None and role.is_enabled and role.access_level <= AccessLevel.ADMIN.value:
+            company_id = role.company_id
+
+    result = feed.changes_since(
+        since, user_id=user.id, company_id=company_id, limit=current_app.config.get("SYNC_PAGE_SIZE", 500)
+    )
+    if result is None:
+        return JSONResponse(
+            **JSONResponse.permanently_deleted(), data={"since": "cursor has expired, reload the lists"}
+        ).to_json()
+
+    return JSONResponse(data=result).to_json()
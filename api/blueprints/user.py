@@ -8,9 +8,12 @@ from api.utils.db_operations import (
     Unaccent,
     update_database_object,
 )
-from api.utils.decorators import json_required, user_required
+from api.utils.decorators import json_required, user_required, idempotent
 from api.utils.enums import AccessLevel, OperationStatus
 from api.services.redis_service import RedisClient as RDS
+from api.services.events_service import EventBus, sse_response
+from api.services import changefeed_service as feed
+from api.monitoring.queries import query_budget
 from api.extensions import db
 from api.models.main import Company, Role, User
 from flask_jwt_extended import get_jwt
@@ -47,6 +50,7 @@ def update_user_info(user, body):
 
     try:
         update_database_object(user, new_records)
+        feed.record_user(user)
         db.session.commit()
     except SQLAlchemyError as e:
         handle_db_error(e)
@@ -57,6 +61,7 @@ def update_user_info(user, body):
 
 
 @user_bp.route("/companies", methods=["GET"])
+@query_budget(3)
 @user_required()
 @json_required()
 def get_user_companies(user):
@@ -82,6 +87,7 @@ def get_user_companies(user):
 
 
 @user_bp.route("/company", methods=["POST"])
+@idempotent()
 @user_required()
 @json_required(
     schema={
@@ -130,6 +136,7 @@ def create_company(user, body):
             inv_status=OperationStatus.ACCEPTED.value,
         )
         db.session.add_all([new_company, new_role])
+        feed.record_role(new_role)
         db.session.commit()
     except SQLAlchemyError as e:
         handle_db_error(e)
@@ -183,10 +190,21 @@ def resolve_company_invitation(user, body, company_id):
     else:
         target_role.inv_status = "rejected"
 
+    event = {"role_id": target_role.id, "user_id": user.id, "company_id": target_role.company_id,
+             "status": target_role.inv_status}
+    feed.record_role(target_role)
     db.session.commit()
+    EventBus.publish("invitation_resolved", event, user_id=event["user_id"], company_id=event["company_id"])
     return JSONResponse(message="invitation resolved successfullt").to_json()
 
 
+@user_bp.route("/events", methods=["GET"])
+@user_required()
+def get_user_events(user):
+    """server-sent events of the user invitations and memberships"""
+    return sse_response([EventBus.user_channel(user.id)])
+
+
 @user_bp.route("/companies/<int:company_id>/activate", methods=["GET"])
 @json_required()
 @user_required()
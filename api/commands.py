@@ -0,0 +1,222 @@
+import csv, io, json, random, time
+from datetime import datetime, timedelta
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, text
+from werkzeug.security import generate_password_hash
+from api.extensions import db
+from api.models.main import Company, Role, User
+from api.utils.enums import AccessLevel, OperationStatus
+
+# realistic distributions of the non owner roles
+INVITATION_STATUS_WEIGHTS = {
+    OperationStatus.ACCEPTED.value: 0.78,
+    OperationStatus.PENDING.value: 0.15,
+    OperationStatus.REJECTED.value: 0.07,
+}
+ACCESS_LEVEL_WEIGHTS = {
+    AccessLevel.ADMIN.value: 0.05,
+    AccessLevel.OPERATOR.value: 0.45,
+    AccessLevel.CLIENT.value: 0.20,
+    AccessLevel.VIEWER.value: 0.30,
+}
+INACTIVE_ROLE_RATE = 0.03
+UNFINISHED_SIGNUP_RATE = 0.05
+TENANT_SIZE_ALPHA = 1.16  # pareto shape, ~80% of the members in ~20% of the companies
+SEED_PASSWORD = "Estokealo12345"
+
+
+class TableLoader:
+    """
+    loads rows in chunks: COPY ... FROM STDIN on postgres, executemany on other databases.
+    sequences are moved past the loaded ids when the load is finished.
+    """
+
+    def __init__(self, table, chunk_size: int = 50000) -> None:
+        self.table = table
+        self.columns = [c.name for c in table.columns]
+        self.chunk_size = chunk_size
+        self.rows = 0
+
+    def load(self, rows) -> int:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self._write(chunk)
+                chunk = []
+        if chunk:
+            self._write(chunk)
+
+        self._reset_sequence()
+        return self.rows
+
+    @staticmethod
+    def _csv_value(value):
+        return json.dumps(value) if isinstance(value, dict) else value
+
+    def _write(self, chunk: list) -> None:
+        if db.engine.dialect.name == "postgresql":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                [[self._csv_value(r.get(c)) for c in self.columns] for r in chunk]
+            )
+            buffer.seek(0)
+            columns = ", ".join(f'"{c}"' for c in self.columns)
+            connection = db.engine.raw_connection()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.copy_expert(
+                        f'COPY "{self.table.name}" ({columns}) FROM STDIN WITH (FORMAT csv)', buffer
+                    )
+                connection.commit()
+            finally:
+                connection.close()
+        else:
+            with db.engine.begin() as connection:
+                connection.execute(self.table.insert(), chunk)
+
+        self.rows += len(chunk)
+
+    def _reset_sequence(self) -> None:
+        if db.engine.dialect.name != "postgresql":
+            return None
+
+        with db.engine.begin() as connection:
+            connection.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{self.table.name}\"', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM \"{self.table.name}\"))"
+                )
+            )
+
+
+def _next_id(model) -> int:
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _random_date(rng: random.Random, now: datetime, days: int = 3 * 365) -> datetime:
+    return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+
+def _user_rows(first_id: int, count: int, rng: random.Random, now: datetime):
+    password_hash = generate_password_hash(SEED_PASSWORD, method="sha256")  # one hash for all users
+    for user_id in range(first_id, first_id + count):
+        yield {
+            "id": user_id,
+            "_email": f"seed{user_id}@estokealo.com",
+            "_password_hash": password_hash,
+            "_signup_completed": rng.random() >= UNFINISHED_SIGNUP_RATE,
+            "_signup_date": _random_date(rng, now),
+            "_profile_image": "",
+            "first_name": f"usuario{user_id}",
+            "last_name": "seed",
+            "phone": "",
+            "address": {"address": {}},
+        }
+
+
+def _company_rows(first_id: int, count: int, rng: random.Random, now: datetime):
+    for company_id in range(first_id, first_id + count):
+        yield {
+            "id": company_id,
+            "_created_at": _random_date(rng, now),
+            "_logo": "",
+            "name": f"empresa seed {company_id}",
+            "tz_name": "america/caracas",
+            "address": {"address": {}},
+            "currency_data": {"currency_data": Company.BASE_CURRENCY},
+        }
+
+
+def _role_rows(first_id: int, users: range, companies: range, members: int, rng: random.Random, now: datetime):
+    """
+    one owner per company (the first users), then 'members' roles of random users
+    in companies picked with a pareto distribution, so a few tenants are very large.
+    """
+    role_id = first_id
+    seen = set()  # (user_id, company_id)
+    for company_id, user_id in zip(companies, users):
+        seen.add((user_id, company_id))
+        yield {
+            "id": role_id,
+            "_relation_date": _random_date(rng, now),
+            "_inv_status": OperationStatus.ACCEPTED.value,
+            "_is_active": True,
+            "user_id": user_id,
+            "company_id": company_id,
+            "access_level": AccessLevel.OWNER.value,
+        }
+        role_id += 1
+
+    if not members:
+        return
+
+    sizes = [rng.paretovariate(TENANT_SIZE_ALPHA) for _ in companies]
+    cum_weights, total = [], 0.0
+    for size in sizes:
+        total += size
+        cum_weights.append(total)
+
+    statuses, status_weights = zip(*INVITATION_STATUS_WEIGHTS.items())
+    levels, level_weights = zip(*ACCESS_LEVEL_WEIGHTS.items())
+    batch = 100000
+    for start in range(0, members, batch):
+        k = min(batch, members - start)
+        picked_companies = rng.choices(companies, cum_weights=cum_weights, k=k)
+        picked_statuses = rng.choices(statuses, weights=status_weights, k=k)
+        picked_levels = rng.choices(levels, weights=level_weights, k=k)
+        for company_id, status, level in zip(picked_companies, picked_statuses, picked_levels):
+            user_id = users[rng.randrange(len(users))]
+            if (user_id, company_id) in seen:
+                continue
+            seen.add((user_id, company_id))
+            yield {
+                "id": role_id,
+                "_relation_date": _random_date(rng, now),
+                "_inv_status": status,
+                "_is_active": rng.random() >= INACTIVE_ROLE_RATE,
+                "user_id": user_id,
+                "company_id": company_id,
+                "access_level": level,
+            }
+            role_id += 1
+
+
+@click.command("seed")
+@click.option("--users", default=100000, show_default=True, help="number of users")
+@click.option("--companies", default=10000, show_default=True, help="number of companies, each one with an owner")
+@click.option("--members", default=None, type=int, help="non owner roles (duplicates are skipped), default: 2 per user")
+@click.option("--chunk-size", default=50000, show_default=True)
+@click.option("--seed", "random_seed", default=0, show_default=True, help="random seed")
+@with_appcontext
+def seed_command(users, companies, members, chunk_size, random_seed):
+    """
+    seeds the database with synthetic users, companies and roles.
+    rows are added after the existing ones, user emails are 'seed<id>@estokealo.com'
+    and all of them have the password 'Estokealo12345'.
+    """
+    if companies > users:
+        raise click.BadParameter("every company needs an owner, companies must be <= users")
+
+    rng = random.Random(random_seed)
+    now = datetime.utcnow()
+    members = users * 2 if members is None else members
+    first_user, first_company, first_role = _next_id(User), _next_id(Company), _next_id(Role)
+    user_ids = range(first_user, first_user + users)
+    company_ids = range(first_company, first_company + companies)
+    db.session.close()
+
+    for name, model, rows in (
+        ("users", User, _user_rows(first_user, users, rng, now)),
+        ("companies", Company, _company_rows(first_company, companies, rng, now)),
+        ("roles", Role, _role_rows(first_role, user_ids, company_ids, members, rng, now)),
+    ):
+        start = time.perf_counter()
+        loaded = TableLoader(model.__table__, chunk_size).load(rows)
+        elapsed = time.perf_counter() - start
+        click.echo(f"{name}: {loaded} rows in {elapsed:.1f}s ({loaded / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+def init_commands(app) -> None:
+    app.cli.add_command(seed_command)
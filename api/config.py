@@ -1,5 +1,6 @@
 import os
 import datetime
+from api.monitoring.pool import TimedQueuePool
 
 
 class Config(object):
@@ -11,17 +12,119 @@ class Config(object):
     JWT_ACCESS_TOKEN_EXPIRES = datetime.timedelta(days=1)
     SQLALCHEMY_DATABASE_URI = os.environ.get("MAIN_DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "poolclass": TimedQueuePool,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_POOL_MAX_OVERFLOW", 5)),
+        "pool_timeout": 10,  # seconds waiting for a connection before TimeoutError
+        "pool_recycle": 1800,  # seconds, below server/proxy idle timeouts
+        "pool_pre_ping": True,  # detects dropped connections before use
+    }
+    DB_STATEMENT_TIMEOUT = 10000  # ms, postgres statement_timeout. 0 disables
+    DB_POOL_WARMUP = 0  # connections opened when the app starts
+    # public user info cache (/auth/user-public-info)
+    PUBLIC_INFO_CACHE_ENABLED = True
+    PUBLIC_INFO_CACHE_TTL = 300  # seconds, redis
+    PUBLIC_INFO_CACHE_NEGATIVE_TTL = 30  # seconds, users not found
+    PUBLIC_INFO_CACHE_LOCAL_SIZE = 1024  # items in the worker LRU
+    PUBLIC_INFO_CACHE_LOCAL_TTL = 5  # seconds, worker LRU
+    # query counter
+    QUERY_COUNTER_ENABLED = True
+    QUERY_BUDGET = 20  # default max queries per request
+    QUERY_REPEAT_THRESHOLD = 5  # identical statements to flag a N+1
+    QUERY_BUDGET_RAISE = False
+    # slow query log
+    SLOW_QUERY_ENABLED = True
+    SLOW_QUERY_THRESHOLD_MS = 200
+    SLOW_QUERY_EXPLAIN_RATE = 0.0  # fraction of slow selects explained with ANALYZE, BUFFERS
+    SLOW_QUERY_BUFFER_SIZE = 200
+    # request timing
+    SERVER_TIMING_HEADER = False
+    TIMING_LOG = True
+    # metrics, /metrics endpoint
+    METRICS_ENABLED = True
+    METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR")  # shared dir for gunicorn workers
+    METRICS_DUMP_INTERVAL = 5  # seconds between worker snapshots
+    # request profiler (X-Profile-Request header or sampling)
+    PROFILER_ENABLED = False
+    PROFILER_SAMPLE_RATE = 0.0
+    PROFILER_MODE = "cprofile"  # cprofile (.pstats) | sampler (collapsed stacks)
+    PROFILER_DIR = os.environ.get("PROFILER_DIR", "/tmp/estokealo-profiles")
+    PROFILER_MAX_FILES = 50
+    PROFILER_TOKEN_MAX_AGE = 3600  # seconds a signed header is valid
+    # memory instrumentation
+    MEMORY_TRACKING = False  # tracemalloc, per endpoint allocations
+    MEMORY_TRACE_FRAMES = 5
+    MEMORY_SNAPSHOT_RATE = 0.01  # fraction of requests that store top allocation sites
+    MEMORY_TOP_SITES = 10
+    MEMORY_MAX_RSS_MB = int(os.environ.get("MEMORY_MAX_RSS_MB", 0))  # 0 disables the worker recycle
+    MEMORY_RSS_CHECK_INTERVAL = 50  # requests between rss checks
+    # logging
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_JSON = True
+    LOG_QUEUE_SIZE = 10000  # records dropped when the queue is full
+    LOG_SAMPLING = {"jwt_expired": 0.1, "jwt_invalid": 0.1}  # fraction of records kept
+    # Idempotency-Key header on mutating endpoints
+    IDEMPOTENCY_ENABLED = True
+    IDEMPOTENCY_TTL = 86400  # seconds a response is replayed
+    IDEMPOTENCY_LOCK_TTL = 30  # seconds, max run time of the first request
+    IDEMPOTENCY_WAIT = 10  # seconds a duplicate waits for the in-flight request
+    # request coalescing of identical concurrent reads (@coalesce)
+    SINGLEFLIGHT_ENABLED = True
+    SINGLEFLIGHT_TIMEOUT = 10  # seconds a duplicate waits before running the view itself
+    MICROCACHE_TTL = 0  # seconds (max 5) a coalesced 200 response is reused, 0 disables
+    # POST /batch
+    BATCH_MAX_REQUESTS = 10  # sub-requests per batch
+    BATCH_TIMEOUT = 10  # seconds, sub-requests that would start later answer 504
+    # server-sent events (/user/events, /company/events), one open connection per client:
+    # use the gevent or gthread workers, a sync worker is blocked by a single stream
+    SSE_HEARTBEAT = 15  # seconds between keepalive comments
+    SSE_MAX_DURATION = 300  # seconds, then the client reconnects
+    SSE_RETRY_MS = 3000  # client reconnection delay
+    # change feed, GET /sync?since=
+    SYNC_PAGE_SIZE = 500  # feed rows per response
+    CHANGE_FEED_RETENTION_DAYS = 30  # older rows are pruned, older cursors get a 410
+    # background jobs (flask jobs ...)
+    JOBS_QUEUES = ["default", "maintenance", "cache"]
+    JOBS_SCHEDULE = {}  # {task name: seconds}, overrides the periodic intervals
+    JOBS_INVITATION_TTL_DAYS = 7  # pending invitations are expired after
+    JOBS_PLACEHOLDER_TTL_DAYS = 30  # invited users that never signed up are deleted after
+    JOBS_CLEANUP_BATCH_SIZE = 1000
+    JOBS_CACHE_WARM_SIZE = 500  # public profiles kept warm in the cache
+    # internal endpoints (/admin/*), X-Admin-Token header
+    ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
 
 
 class ProductionConfig(Config):
-    pass
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **Config.SQLALCHEMY_ENGINE_OPTIONS,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("DB_POOL_MAX_OVERFLOW", 10)),
+    }
+    DB_POOL_WARMUP = int(os.environ.get("DB_POOL_WARMUP", 2))
+    SLOW_QUERY_EXPLAIN_RATE = float(os.environ.get("SLOW_QUERY_EXPLAIN_RATE", 0.05))
+    PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "") == "1"
+    PROFILER_MODE = "sampler"
 
 
 class DevelopmentConfig(Config):
     DEVELOPMENT = True
     DEBUG = True
     PROPAGATE_EXCEPTIONS = None
+    SERVER_TIMING_HEADER = True
+    LOG_JSON = False
+    LOG_SAMPLING = {}
+    PROFILER_ENABLED = True
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **Config.SQLALCHEMY_ENGINE_OPTIONS,
+        "pool_size": 2,
+        "max_overflow": 2,
+    }
+    DB_STATEMENT_TIMEOUT = 30000
 
 
 class TestingConfig(Config):
     TESTING = True
+    PUBLIC_INFO_CACHE_ENABLED = False
+    QUERY_BUDGET_RAISE = True
+    DB_STATEMENT_TIMEOUT = 5000
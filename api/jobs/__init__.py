@@ -0,0 +1,125 @@
+"""
+background jobs and periodic maintenance, stored in the redis store.
+
+- define jobs with @task / @periodic (api/jobs/tasks.py), enqueue them with task.delay(...).
+- run workers with `flask jobs worker [--processes N] [--queues default,maintenance,cache] [--scheduler]`,
+  one process (or a dedicated `flask jobs scheduler`) must run the scheduler.
+- inspect with `flask jobs status`, `flask jobs failed`, `flask jobs retry-failed`,
+  run a job inline with `flask jobs run <task name>`.
+"""
+import json, logging, multiprocessing, os, signal, time
+import click
+from api.jobs.queue import JobQueue, PERIODIC, Scheduler, TASKS, Worker, periodic, task
+from api.jobs import tasks  # registers the maintenance tasks
+
+logger = logging.getLogger(__name__)
+
+
+def _worker_process(app, queues: list[str], scheduler: bool) -> None:
+    from api import reinit_after_fork
+
+    reinit_after_fork(app)  # db pool, log thread and caches inherited from the parent
+    try:
+        Worker(app, queues, scheduler=scheduler).run()
+    finally:
+        app.extensions["log_pipeline"].stop()  # forked children exit without atexit hooks
+
+
+class JobRunner:
+    """
+    registers the job settings and the `flask jobs` cli group.
+    - JOBS_QUEUES: queues a worker consumes by default.
+    - JOBS_SCHEDULE: {task name: seconds} overrides of the periodic intervals, 0 disables a task.
+    """
+
+    def __init__(self, app=None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("JOBS_QUEUES", ["default", "maintenance", "cache"])
+        app.config.setdefault("JOBS_SCHEDULE", {})
+        app.config.setdefault("JOBS_INVITATION_TTL_DAYS", 7)
+        app.config.setdefault("JOBS_PLACEHOLDER_TTL_DAYS", 30)
+        app.config.setdefault("JOBS_CLEANUP_BATCH_SIZE", 1000)
+        app.config.setdefault("JOBS_CACHE_WARM_SIZE", 500)
+        app.config.setdefault("CHANGE_FEED_RETENTION_DAYS", 30)
+
+        app.extensions["jobs"] = self
+        self._register_cli(app)
+        return None
+
+    def _register_cli(self, app) -> None:
+        @app.cli.group("jobs")
+        def jobs_group():
+            """background jobs commands"""
+
+        @jobs_group.command("worker")
+        @click.option("--processes", default=1, show_default=True, help="worker processes")
+        @click.option("--queues", default=None, help="comma separated, default: JOBS_QUEUES")
+        @click.option("--scheduler", is_flag=True, help="also enqueue the periodic tasks")
+        def worker_command(processes, queues, scheduler):
+            """run jobs until SIGTERM"""
+            queues = queues.split(",") if queues else app.config["JOBS_QUEUES"]
+            if processes == 1:
+                Worker(app, queues, scheduler=scheduler).run()
+                return None
+
+            JobQueue().requeue_orphans()  # also starts the embedded redis server once, before fork
+            ctx = multiprocessing.get_context("fork")
+            children = [
+                ctx.Process(target=_worker_process, args=(app, queues, scheduler and i == 0), daemon=False)
+                for i in range(processes)
+            ]
+            for child in children:
+                child.start()
+
+            def forward(signum, frame):
+                for child in children:
+                    if child.is_alive():
+                        os.kill(child.pid, signal.SIGTERM)
+
+            signal.signal(signal.SIGTERM, forward)
+            signal.signal(signal.SIGINT, forward)
+            for child in children:
+                child.join()
+
+            return None
+
+        @jobs_group.command("scheduler")
+        @click.option("--interval", default=1.0, show_default=True, help="seconds between ticks")
+        def scheduler_command(interval):
+            """enqueue the periodic tasks, without running jobs"""
+            scheduler = Scheduler(JobQueue(), app.config["JOBS_SCHEDULE"])
+            while True:
+                for name in scheduler.tick():
+                    click.echo(f"enqueued {name}")
+                time.sleep(interval)
+
+        @jobs_group.command("status")
+        def status_command():
+            """queue lengths, scheduled and failed jobs, live workers"""
+            stats = JobQueue().stats()
+            stats["periodic"] = {
+                name: app.config["JOBS_SCHEDULE"].get(name, every) for name, (t, every) in PERIODIC.items()
+            }
+            click.echo(json.dumps(stats, indent=2))
+
+        @jobs_group.command("failed")
+        @click.option("--limit", default=20, show_default=True)
+        def failed_command(limit):
+            """last failed jobs"""
+            click.echo(json.dumps(JobQueue().failed(limit), indent=2))
+
+        @jobs_group.command("retry-failed")
+        def retry_failed_command():
+            """move the failed jobs back to their queues"""
+            click.echo(f"{JobQueue().retry_failed()} jobs requeued")
+
+        @jobs_group.command("run")
+        @click.argument("name")
+        def run_command(name):
+            """run a task now, in this process"""
+            if name not in TASKS:
+                raise click.BadParameter(f"unknown task, one of: {', '.join(sorted(TASKS))}")
+            click.echo(repr(TASKS[name]()))
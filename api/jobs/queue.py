@@ -0,0 +1,297 @@
+import json, logging, os, random, signal, socket, threading, time, uuid
+from redis.exceptions import RedisError
+from api.services.redis_service import RedisClient
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "jobs:"
+SCHEDULED_KEY = f"{PREFIX}scheduled"  # zset, score = run at (epoch)
+FAILED_KEY = f"{PREFIX}failed"  # list of jobs out of retries
+TASKS = {}  # name: Task
+PERIODIC = {}  # name: (Task, every seconds)
+
+
+def queue_key(queue: str) -> str:
+    return f"{PREFIX}queue:{queue}"
+
+
+def processing_key(worker_id: str) -> str:
+    return f"{PREFIX}processing:{worker_id}"
+
+
+def heartbeat_key(worker_id: str) -> str:
+    return f"{PREFIX}worker:{worker_id}"
+
+
+class Task:
+    """function registered as a job, run it in a worker with .delay(*args, **kwargs)"""
+
+    def __init__(self, fn, name: str, queue: str = "default", retries: int = 3, backoff: float = 10) -> None:
+        self.fn = fn
+        self.name = name
+        self.queue = queue
+        self.retries = retries
+        self.backoff = backoff
+
+    def __repr__(self) -> str:
+        return f"Task(name={self.name!r}, queue={self.queue!r})"
+
+    def __call__(self, *args, **kwargs):
+        return self.fn(*args, **kwargs)
+
+    def delay(self, *args, **kwargs) -> str:
+        return JobQueue().enqueue(self, args, kwargs)
+
+    def delay_in(self, seconds: float, *args, **kwargs) -> str:
+        return JobQueue().enqueue(self, args, kwargs, run_at=time.time() + seconds)
+
+
+def task(name: str = None, queue: str = "default", retries: int = 3, backoff: float = 10):
+    """
+    registers a job function. args and kwargs must be json serializable.
+    failed jobs are retried 'retries' times, after backoff * 2 ** (attempt - 1) seconds.
+    """
+
+    def decorator(fn):
+        t = Task(fn, name or f"{fn.__module__}.{fn.__name__}", queue, retries, backoff)
+        TASKS[t.name] = t
+        return t
+
+    return decorator
+
+
+def periodic(every: float, **task_options):
+    """registers a job that the scheduler enqueues every 'every' seconds"""
+
+    def decorator(fn):
+        t = task(**task_options)(fn)
+        PERIODIC[t.name] = (t, every)
+        return t
+
+    return decorator
+
+
+class JobQueue:
+    """
+    jobs stored in redis:
+    - jobs:queue:<queue> list of ready jobs, workers move them atomically to
+      jobs:processing:<worker id> while they run (BRPOPLPUSH).
+    - jobs:scheduled zset of delayed jobs and retries.
+    - jobs:failed list of jobs out of retries.
+    """
+
+    def __init__(self) -> None:
+        self.rdb = RedisClient().set_connection()
+
+    def enqueue(self, t: Task, args: tuple = (), kwargs: dict = None, run_at: float = None) -> str:
+        job = {
+            "id": uuid.uuid4().hex,
+            "task": t.name,
+            "queue": t.queue,
+            "args": list(args),
+            "kwargs": kwargs or {},
+            "attempts": 0,
+            "enqueued_at": time.time(),
+        }
+        self.push(job, run_at)
+        return job["id"]
+
+    def push(self, job: dict, run_at: float = None) -> None:
+        raw = json.dumps(job)
+        if run_at is not None and run_at > time.time():
+            self.rdb.zadd(SCHEDULED_KEY, {raw: run_at})
+        else:
+            self.rdb.lpush(queue_key(job["queue"]), raw)
+
+    def promote_scheduled(self, limit: int = 100) -> int:
+        """moves the due scheduled jobs to their queues, safe with several workers"""
+        moved = 0
+        for raw in self.rdb.zrangebyscore(SCHEDULED_KEY, "-inf", time.time(), start=0, num=limit):
+            if self.rdb.zrem(SCHEDULED_KEY, raw):  # only the worker that removed it pushes it
+                self.rdb.lpush(queue_key(json.loads(raw)["queue"]), raw)
+                moved += 1
+
+        return moved
+
+    def requeue_orphans(self) -> int:
+        """jobs left in the processing list of dead workers go back to their queue"""
+        requeued = 0
+        for key in self.rdb.scan_iter(match=processing_key("*")):
+            key = key.decode() if isinstance(key, bytes) else key
+            worker_id = key[len(processing_key("")):]
+            if self.rdb.exists(heartbeat_key(worker_id)):
+                continue
+            while True:
+                raw = self.rdb.rpoplpush(key, queue_key("_orphans"))
+                if raw is None:
+                    break
+                self.rdb.lrem(queue_key("_orphans"), 1, raw)
+                self.rdb.lpush(queue_key(json.loads(raw)["queue"]), raw)
+                requeued += 1
+
+        return requeued
+
+    def stats(self) -> dict:
+        queues = {}
+        for key in self.rdb.scan_iter(match=queue_key("*")):
+            key = key.decode() if isinstance(key, bytes) else key
+            queues[key[len(queue_key("")):]] = self.rdb.llen(key)
+
+        workers = [
+            (k.decode() if isinstance(k, bytes) else k)[len(heartbeat_key("")):]
+            for k in self.rdb.scan_iter(match=heartbeat_key("*"))
+        ]
+        return {
+            "queues": queues,
+            "scheduled": self.rdb.zcard(SCHEDULED_KEY),
+            "failed": self.rdb.llen(FAILED_KEY),
+            "workers": sorted(workers),
+        }
+
+    def failed(self, limit: int = 20) -> list[dict]:
+        return [json.loads(raw) for raw in self.rdb.lrange(FAILED_KEY, 0, limit - 1)]
+
+    def retry_failed(self) -> int:
+        retried = 0
+        while True:
+            raw = self.rdb.rpop(FAILED_KEY)
+            if raw is None:
+                return retried
+            job = json.loads(raw)
+            job["attempts"] = 0
+            job.pop("error", None)
+            self.push(job)
+            retried += 1
+
+
+class Scheduler:
+    """
+    enqueues the periodic tasks. several schedulers can run at the same time,
+    a redis lock (SET NX EX) per task and period lets only one of them enqueue it.
+    'schedule' overrides the periodic intervals, {task name: seconds}, 0 disables a task.
+    """
+
+    def __init__(self, queue: JobQueue, schedule: dict = None) -> None:
+        self.queue = queue
+        self.schedule = schedule or {}
+
+    def tick(self) -> list[str]:
+        enqueued = []
+        for name, (t, every) in PERIODIC.items():
+            every = self.schedule.get(name, every)
+            if not every:
+                continue
+            if self.queue.rdb.set(f"{PREFIX}periodic:{name}", time.time(), nx=True, ex=max(int(every), 1)):
+                t.delay()
+                enqueued.append(name)
+
+        return enqueued
+
+
+class Worker:
+    """
+    runs jobs of 'queues' inside an app context until SIGTERM/SIGINT,
+    the job in progress is finished before exiting.
+    a thread refreshes the heartbeat key, also while a long job runs, so requeue_orphans
+    of other workers only takes the jobs of dead workers.
+    """
+
+    HEARTBEAT_TTL = 30
+
+    def __init__(self, app, queues: list[str], scheduler: bool = False, poll_timeout: int = 1) -> None:
+        self.app = app
+        self.queues = queues
+        self.poll_timeout = poll_timeout
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.queue = JobQueue()
+        self.scheduler = Scheduler(self.queue, app.config.get("JOBS_SCHEDULE")) if scheduler else None
+        self.running = True
+        self.stopped = threading.Event()
+
+    def stop(self, *args) -> None:
+        self.running = False
+
+    def beat(self) -> None:
+        self.queue.rdb.set(heartbeat_key(self.worker_id), "", ex=self.HEARTBEAT_TTL)
+
+    def _heartbeat(self) -> None:
+        while not self.stopped.wait(self.HEARTBEAT_TTL / 3):
+            try:
+                self.beat()
+            except RedisError as e:
+                logger.error("job worker heartbeat failed: %s", e)
+
+    def run(self) -> None:
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        logger.info("job worker %s started, queues: %s", self.worker_id, self.queues)
+        self.beat()
+        self.queue.requeue_orphans()
+        heartbeat = threading.Thread(target=self._heartbeat, name="jobs-heartbeat", daemon=True)
+        heartbeat.start()
+
+        while self.running:
+            try:
+                if self.scheduler is not None:
+                    self.scheduler.tick()
+                self.queue.promote_scheduled()
+                self.work_once()
+            except RedisError as e:
+                logger.error("job worker redis error: %s", e)
+                time.sleep(self.poll_timeout)
+
+        self.stopped.set()
+        heartbeat.join()
+        self.queue.rdb.delete(heartbeat_key(self.worker_id))
+        logger.info("job worker %s stopped", self.worker_id)
+
+    def work_once(self) -> bool:
+        """runs one job, returns False when the queues were empty"""
+        processing = processing_key(self.worker_id)
+        raw = None
+        for name in random.sample(self.queues, len(self.queues)):  # no queue starves the others
+            raw = self.queue.rdb.rpoplpush(queue_key(name), processing)
+            if raw is not None:
+                break
+
+        if raw is None:
+            raw = self.queue.rdb.brpoplpush(queue_key(self.queues[0]), processing, timeout=self.poll_timeout)
+            if raw is None:
+                return False
+
+        job = json.loads(raw)
+        try:
+            self.execute(job)
+        finally:
+            self.queue.rdb.lrem(processing, 1, raw)
+
+        return True
+
+    def execute(self, job: dict) -> None:
+        t = TASKS.get(job["task"])
+        job["attempts"] += 1
+        start = time.perf_counter()
+        try:
+            if t is None:
+                raise LookupError(f"unknown task {job['task']!r}")
+            with self.app.app_context():
+                t.fn(*job["args"], **job["kwargs"])
+        except Exception as e:
+            job["error"] = repr(e)
+            retries = t.retries if t is not None else 0
+            if job["attempts"] <= retries:
+                delay = t.backoff * 2 ** (job["attempts"] - 1)
+                self.queue.push(job, run_at=time.time() + delay)
+                logger.warning("job %s %s failed, retry in %.0fs: %r", job["task"], job["id"], delay, e)
+            else:
+                self.queue.rdb.lpush(FAILED_KEY, json.dumps(job))
+                logger.error("job %s %s failed: %r", job["task"], job["id"], e, exc_info=True)
+            return None
+
+        logger.info(
+            "job done",
+            extra={"data": {"event": "job_done", "task": job["task"], "job_id": job["id"],
+                            "ms": round((time.perf_counter() - start) * 1000, 2)}},
+        )
+        return None
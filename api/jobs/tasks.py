@@ -0,0 +1,127 @@
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, exists, func, select, update
+from api.extensions import db
+from api.models.main import ChangeFeed, Role, User
+from api.services.cache_service import PublicInfoCache
+from api.services import changefeed_service as feed
+from api.services.events_service import EventBus
+from api.utils.enums import OperationStatus
+from api.jobs.queue import periodic
+
+logger = logging.getLogger(__name__)
+
+
+@periodic(every=3600, queue="maintenance")
+def expire_invitations() -> int:
+    """pending invitations older than JOBS_INVITATION_TTL_DAYS are marked as expired"""
+    limit = datetime.utcnow() - timedelta(days=current_app.config["JOBS_INVITATION_TTL_DAYS"])
+    expired = db.session.execute(
+        update(Role)
+        .where(Role._inv_status == OperationStatus.PENDING.value, Role._relation_date < limit)
+        .values(_inv_status=OperationStatus.EXPIRED.value)
+        .returning(Role.id, Role.user_id, Role.company_id, Role._is_active)
+        .execution_options(synchronize_session=False)
+    ).all()
+    feed.record_changes([
+        {"entity": "role", "entity_id": r.id, "user_id": r.user_id, "company_id": r.company_id} for r in expired
+    ])
+    db.session.commit()
+
+    for r in expired:
+        EventBus.publish(
+            "invitation_expired",
+            {"role_id": r.id, "user_id": r.user_id, "company_id": r.company_id,
+             "status": OperationStatus.EXPIRED.value, "is_active": r._is_active},
+            user_id=r.user_id,
+            company_id=r.company_id,
+        )
+    logger.info("invitations expired", extra={"data": {"event": "invitations_expired", "rows": len(expired)}})
+    return len(expired)
+
+
+@periodic(every=6 * 3600, queue="maintenance")
+def cleanup_placeholder_users() -> int:
+    """
+    deletes users created by an invitation that never completed the signup,
+    older than JOBS_PLACEHOLDER_TTL_DAYS and without pending or accepted invitations.
+    """
+    limit = datetime.utcnow() - timedelta(days=current_app.config["JOBS_PLACEHOLDER_TTL_DAYS"])
+    live_role = exists().where(
+        Role.user_id == User.id,
+        Role._inv_status.in_([OperationStatus.PENDING.value, OperationStatus.ACCEPTED.value]),
+    )
+    batch = current_app.config["JOBS_CLEANUP_BATCH_SIZE"]
+    deleted = 0
+    while True:
+        user_ids = db.session.execute(
+            select(User.id)
+            .where(User._signup_completed.is_(False), User._signup_date < limit, ~live_role)
+            .limit(batch)
+        ).scalars().all()
+        if not user_ids:
+            break
+
+        roles = db.session.execute(
+            delete(Role).where(Role.user_id.in_(user_ids)).returning(Role.id, Role.user_id, Role.company_id)
+        ).all()
+        feed.record_changes([  # tombstones
+            {"entity": "role", "entity_id": r.id, "op": "delete", "user_id": r.user_id, "company_id": r.company_id}
+            for r in roles
+        ])
+        db.session.execute(delete(User).where(User.id.in_(user_ids)))
+        db.session.commit()
+        deleted += len(user_ids)
+        if len(user_ids) < batch:
+            break
+
+    logger.info("placeholder users deleted", extra={"data": {"event": "placeholders_deleted", "rows": deleted}})
+    return deleted
+
+
+@periodic(every=240, queue="cache", retries=0)
+def warm_public_info_cache() -> int:
+    """
+    fills the public info cache for the users with more enabled companies,
+    the most expensive profiles to serialize. runs before PUBLIC_INFO_CACHE_TTL expires.
+    """
+    size = current_app.config["JOBS_CACHE_WARM_SIZE"]
+    cache = PublicInfoCache()
+    if not size or not cache.enabled:
+        return 0
+
+    user_ids = db.session.execute(
+        select(Role.user_id)
+        .join(User, User.id == Role.user_id)
+        .where(
+            User._signup_completed.is_(True),
+            Role._inv_status == OperationStatus.ACCEPTED.value,
+            Role._is_active.is_(True),
+        )
+        .group_by(Role.user_id)
+        .order_by(func.count(Role.id).desc())
+        .limit(size)
+    ).scalars().all()
+
+    users = db.session.execute(select(User).where(User.id.in_(user_ids))).scalars()
+    warmed = 0
+    for user in users:
+        cache.set(user.email, user.serialize_public_info())
+        warmed += 1
+
+    db.session.rollback()
+    return warmed
+
+
+@periodic(every=24 * 3600, queue="maintenance")
+def prune_change_feed() -> int:
+    """
+    deletes feed rows older than CHANGE_FEED_RETENTION_DAYS, clients with an older
+    cursor get a 410 from /sync and reload their lists.
+    """
+    limit = datetime.utcnow() - timedelta(days=current_app.config["CHANGE_FEED_RETENTION_DAYS"])
+    result = db.session.execute(delete(ChangeFeed).where(ChangeFeed._created_at < limit))
+    db.session.commit()
+    logger.info("change feed pruned", extra={"data": {"event": "change_feed_pruned", "rows": result.rowcount}})
+    return result.rowcount
@@ -4,6 +4,7 @@ from api.utils.enums import AccessLevel, OperationStatus
 from datetime import datetime
 from werkzeug.security import generate_password_hash
 from sqlalchemy.dialects.postgresql import JSON
+from api.monitoring.timing import timed
 
 class User(db.Model):
     """User Model"""
@@ -63,6 +64,7 @@ class User(db.Model):
         })
         return base_dict
 
+    @timed("serialize")
     def serialize_public_info(self) -> dict:
         base_dict = self._base_serializer()
         base_dict.update({
@@ -101,6 +103,7 @@ class User(db.Model):
         return self._password_hash
 
     @password.setter
+    @timed("password_hash")
     def password(self, password):
         self._password_hash = generate_password_hash(password, method='sha256')
 
@@ -266,3 +269,24 @@ class Store(db.Model):
 
     def _base_serialize(self) -> dict:
         return {"id": self.id, "name": self.name}
+
+
+class ChangeFeed(db.Model):
+    """
+    changes of roles, companies and users, in commit order, read by GET /sync.
+    - id is the sequence number, clients keep the last one they saw as cursor.
+    - op 'delete' rows are tombstones of deleted roles.
+    - user_id/company_id are the audience: the user and the company that must see the change.
+    """
+
+    __tablename__ = "change_feed"
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    _created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    entity = db.Column(db.String(16), nullable=False)  # ["role", "company", "user"]
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(8), nullable=False, default="upsert")  # ["upsert", "delete"]
+    user_id = db.Column(db.Integer, index=True)
+    company_id = db.Column(db.Integer, index=True)
+
+    def __repr__(self) -> str:
+        return f"ChangeFeed(id={self.id}, entity={self.entity}, op={self.op})"
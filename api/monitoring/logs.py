@@ -0,0 +1,178 @@
+import atexit, copy, json, logging, queue, random, sys, uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+
+
+class JSONFormatter(logging.Formatter):
+    """one json object per line, with the 'data' dict given in extra={"data": {...}}"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        rv = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        data = getattr(record, "data", None)
+        if isinstance(data, dict):
+            rv.update(data)
+
+        if record.exc_info:
+            rv["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            rv["exception"] = record.exc_text  # formatted by NonBlockingQueueHandler.prepare
+
+        return json.dumps(rv, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """human readable lines for development, the 'data' dict is appended as key=value pairs"""
+
+    def __init__(self) -> None:
+        super().__init__("[%(asctime)s] %(levelname)s %(name)s [%(request_id)s]: %(message)s")
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        data = getattr(record, "data", None)
+        if isinstance(data, dict) and data:
+            line += "\n" + "\n".join(f"    {key}={value}" for key, value in data.items())
+        return line
+
+
+class RequestIdFilter(logging.Filter):
+    """adds the id of the current request to every record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = g.get("request_id") if has_request_context() else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    keeps a fraction of the records of high volume events.
+    records are sampled by the key given in extra={"sample_key": "..."}
+    """
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self.dropped = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None or key not in self.rates:
+            return True
+
+        if random.random() < self.rates[key]:
+            return True
+
+        self.dropped[key] = self.dropped.get(key, 0) + 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """drops records when the queue is full instead of blocking the request"""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        merges the args in the message like QueueHandler.prepare, but keeps the traceback
+        in exc_text instead of folding it in the message, the formatter of the listener
+        places it (an "exception" field in json).
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None  # the traceback holds the frames of the request thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """
+    queue based logging for the 'api' logger tree:
+    request threads only put records in a bounded queue, a QueueListener thread
+    formats them (json) and writes them to stdout.
+    every request gets an id (X-Request-ID header, generated when missing),
+    which is added to its log records and to the response.
+    """
+
+    def __init__(self, app=None) -> None:
+        self.listener = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("LOG_LEVEL", "INFO")
+        app.config.setdefault("LOG_JSON", True)
+        app.config.setdefault("LOG_QUEUE_SIZE", 10000)
+        app.config.setdefault("LOG_SAMPLING", {})
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if app.config["LOG_JSON"]:
+            stream_handler.setFormatter(JSONFormatter())
+        else:
+            stream_handler.setFormatter(TextFormatter())
+
+        self.queue_handler = NonBlockingQueueHandler(queue.Queue(app.config["LOG_QUEUE_SIZE"]))
+        self.queue_handler.addFilter(RequestIdFilter())
+        self.queue_handler.addFilter(SamplingFilter(app.config["LOG_SAMPLING"]))
+
+        logger = logging.getLogger(app.import_name.split(".")[0])
+        logger.setLevel(app.config["LOG_LEVEL"])
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)  # flask default handler writes synchronously to stderr
+        logger.addHandler(self.queue_handler)
+        logger.propagate = False
+
+        self.start(stream_handler)
+        atexit.register(self.stop)  # once, restart() after fork reuses it
+        app.extensions["log_pipeline"] = self
+        app.before_request(self._set_request_id)
+        app.after_request(self._add_request_id_header)
+        return None
+
+    def start(self, *handlers) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+
+        self.listener = QueueListener(self.queue_handler.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """flushes the queue and stops the listener thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def restart(self) -> None:
+        """starts a new listener thread, needed in a forked worker (threads don't survive fork)"""
+        if self.listener is not None:
+            handlers = self.listener.handlers
+            self.listener = None
+            self.start(*handlers)
+
+    @staticmethod
+    def _set_request_id() -> None:
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+
+    @staticmethod
+    def _add_request_id_header(response):
+        request_id = g.get("request_id")
+        if request_id:
+            response.headers["X-Request-ID"] = request_id
+        return response
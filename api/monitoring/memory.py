@@ -0,0 +1,142 @@
+import logging, os, random, signal, threading, tracemalloc
+from flask import current_app, g, request
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def current_rss() -> int:
+    """resident set size of the worker, in bytes"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class EndpointMemory:
+    """allocation stats of one endpoint"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.net_total = 0
+        self.peak_max = 0
+        self.top_sites = []
+
+    def add(self, net: int, peak: int) -> None:
+        self.requests += 1
+        self.net_total += net
+        self.peak_max = max(self.peak_max, peak)
+
+    def serialize(self) -> dict:
+        return {
+            "requests": self.requests,
+            "net_total_kb": round(self.net_total / 1024, 1),
+            "net_avg_kb": round(self.net_total / self.requests / 1024, 2) if self.requests else 0,
+            "peak_max_kb": round(self.peak_max / 1024, 1),
+            "top_sites": self.top_sites,
+        }
+
+
+class MemoryTracker:
+    """
+    memory instrumentation of the API app.
+    - MEMORY_TRACKING: tracemalloc based peak and net allocations per endpoint.
+      for a MEMORY_SNAPSHOT_RATE fraction of requests the top allocation sites are stored.
+      tracemalloc is process wide, so numbers are exact only with one request at a time
+      per worker (sync workers).
+    - MEMORY_MAX_RSS_MB: after a request, when the worker RSS is over the limit, the worker
+      asks gunicorn for a graceful restart (SIGTERM to itself).
+    stats are available at GET /admin/memory.
+    """
+
+    def __init__(self, app=None) -> None:
+        self.endpoints = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._recycling = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("MEMORY_TRACKING", False)
+        app.config.setdefault("MEMORY_TRACE_FRAMES", 5)
+        app.config.setdefault("MEMORY_SNAPSHOT_RATE", 0.01)
+        app.config.setdefault("MEMORY_TOP_SITES", 10)
+        app.config.setdefault("MEMORY_MAX_RSS_MB", 0)
+        app.config.setdefault("MEMORY_RSS_CHECK_INTERVAL", 50)
+
+        app.extensions["memory_tracker"] = self
+        if app.config["MEMORY_TRACKING"]:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(app.config["MEMORY_TRACE_FRAMES"])
+            app.before_request(self._start)
+            app.teardown_request(self._stop)
+
+        if app.config["MEMORY_MAX_RSS_MB"]:
+            app.teardown_request(self._check_rss)
+
+        return None
+
+    @staticmethod
+    def _start() -> None:
+        tracemalloc.reset_peak()
+        snapshot = None
+        if random.random() < current_app.config["MEMORY_SNAPSHOT_RATE"]:
+            snapshot = tracemalloc.take_snapshot()
+
+        g.memory_start = (tracemalloc.get_traced_memory()[0], snapshot)
+
+    def _stop(self, exc=None) -> None:
+        item = g.pop("memory_start", None)
+        if item is None:
+            return None
+
+        before, snapshot = item
+        current, peak = tracemalloc.get_traced_memory()
+        endpoint = request.endpoint or "not_found"
+
+        top_sites = None
+        if snapshot is not None:
+            stats = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")
+            top_sites = [
+                {"site": str(s.traceback), "size_diff_kb": round(s.size_diff / 1024, 2), "count_diff": s.count_diff}
+                for s in stats[: current_app.config["MEMORY_TOP_SITES"]]
+            ]
+
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, EndpointMemory())
+            stats.add(current - before, peak - before)
+            if top_sites is not None:
+                stats.top_sites = top_sites
+
+        return None
+
+    def _check_rss(self, exc=None) -> None:
+        self._requests += 1
+        if self._recycling or self._requests % current_app.config["MEMORY_RSS_CHECK_INTERVAL"]:
+            return None
+
+        rss_mb = current_rss() / 1024 / 1024
+        if rss_mb <= current_app.config["MEMORY_MAX_RSS_MB"]:
+            return None
+
+        if "gunicorn" in request.environ.get("SERVER_SOFTWARE", ""):
+            logger.warning("worker %s rss %.0f MB over limit, restarting", os.getpid(), rss_mb)
+            self._recycling = True
+            os.kill(os.getpid(), signal.SIGTERM)  # gunicorn finishes the current request and replaces the worker
+        else:
+            logger.warning("worker %s rss %.0f MB over limit", os.getpid(), rss_mb)
+
+        return None
+
+    def serialize(self) -> dict:
+        with self._lock:
+            endpoints = {k: v.serialize() for k, v in self.endpoints.items()}
+
+        return {"pid": os.getpid(), "rss_mb": round(current_rss() / 1024 / 1024, 1), "endpoints": endpoints}
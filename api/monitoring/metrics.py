@@ -0,0 +1,312 @@
+import glob, json, os, threading, time
+from flask import g, request
+from api.extensions import db
+from api.monitoring import timing
+from api.monitoring.pool import pool_status
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    """base metric, values are stored by label values tuple"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(name={self.name})"
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            values = [[list(k), v] for k, v in self.values.items()]
+
+        return {
+            "kind": self.kind,
+            "documentation": self.documentation,
+            "labelnames": list(self.labelnames),
+            "values": values,
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """values are stored as [bucket counts..., sum, count], buckets are not cumulative"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            item = self.values.get(key)
+            if item is None:
+                item = self.values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    item[i] += 1
+                    break
+            item[-2] += value
+            item[-1] += 1
+
+    def snapshot(self) -> dict:
+        rv = super().snapshot()
+        rv["buckets"] = list(self.buckets)
+        return rv
+
+
+class MetricsRegistry:
+    """
+    holds the metrics of a worker and renders them in prometheus text format.
+    in multiprocess mode, each worker dumps its snapshot to 'multiproc_dir',
+    and the worker serving the scrape merges all the snapshots:
+    - counters and histograms are summed, including the ones of dead workers.
+    - gauges are summed only for live workers.
+    """
+
+    def __init__(self) -> None:
+        self.metrics = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> dict:
+        return {name: m.snapshot() for name, m in self.metrics.items()}
+
+    def dump(self, multiproc_dir: str) -> None:
+        """atomic write of the worker snapshot"""
+        path = os.path.join(multiproc_dir, f"metrics_{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @classmethod
+    def merge(cls, snapshots: list[tuple[int, dict]]) -> dict:
+        merged = {}
+        for pid, snapshot in snapshots:
+            alive = cls._pid_alive(pid)
+            for name, metric in snapshot.items():
+                if metric["kind"] == "gauge" and not alive:
+                    continue
+
+                target = merged.setdefault(name, {**metric, "values": {}})
+                for labels, value in metric["values"]:
+                    key = tuple(labels)
+                    current = target["values"].get(key)
+                    if current is None:
+                        target["values"][key] = value
+                    elif isinstance(value, list):
+                        target["values"][key] = [a + b for a, b in zip(current, value)]
+                    else:
+                        target["values"][key] = current + value
+
+        for metric in merged.values():
+            metric["values"] = [[list(k), v] for k, v in metric["values"].items()]
+
+        return merged
+
+    def collect(self, multiproc_dir: str = None) -> dict:
+        if not multiproc_dir:
+            return self.snapshot()
+
+        self.dump(multiproc_dir)
+        snapshots = []
+        for path in glob.glob(os.path.join(multiproc_dir, "metrics_*.json")):
+            try:
+                pid = int(os.path.basename(path)[len("metrics_"):-len(".json")])
+                with open(path) as f:
+                    snapshots.append((pid, json.load(f)))
+            except (ValueError, OSError):
+                continue  # file being replaced or not a snapshot
+
+        return self.merge(snapshots)
+
+    @staticmethod
+    def _labels(names: list, values: list, extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self, multiproc_dir: str = None) -> str:
+        """prometheus text exposition format (0.0.4)"""
+        lines = []
+        for name, metric in sorted(self.collect(multiproc_dir).items()):
+            lines.append(f"# HELP {name} {metric['documentation']}")
+            lines.append(f"# TYPE {name} {metric['kind']}")
+            names = metric["labelnames"]
+            for labels, value in metric["values"]:
+                if metric["kind"] != "histogram":
+                    lines.append(f"{name}{self._labels(names, labels)} {value}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(metric["buckets"], value):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{name}_bucket{self._labels(names, labels, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{name}_bucket{self._labels(names, labels, le)} {value[-1]}")
+                lines.append(f"{name}_sum{self._labels(names, labels)} {value[-2]}")
+                lines.append(f"{name}_count{self._labels(names, labels)} {value[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+REQUEST_LATENCY = registry.histogram(
+    "api_request_duration_seconds", "request latency by endpoint", ("endpoint", "method")
+)
+REQUESTS_TOTAL = registry.counter(
+    "api_requests_total", "requests by endpoint and status code", ("endpoint", "method", "status")
+)
+REQUESTS_IN_FLIGHT = registry.gauge("api_requests_in_flight", "requests being served")
+DEPENDENCY_CALLS = registry.counter(
+    "api_dependency_calls_total", "calls to redis and the email api", ("dependency",)
+)
+DEPENDENCY_SECONDS = registry.counter(
+    "api_dependency_seconds_total", "time spent in redis and email api calls", ("dependency",)
+)
+EMAIL_ERRORS = registry.counter("api_email_errors_total", "failed calls to the email api")
+DB_POOL = registry.gauge("api_db_pool", "db pool state", ("state",))
+DB_POOL_EVENTS = registry.counter(
+    "api_db_pool_events_total", "db pool events (checkouts, timeouts, connects...)", ("event",)
+)
+
+
+def _observe_span(name: str, duration: float) -> None:
+    if name in ("redis", "email"):
+        DEPENDENCY_CALLS.inc(dependency=name)
+        DEPENDENCY_SECONDS.inc(duration, dependency=name)
+
+
+class Metrics:
+    """
+    per endpoint metrics of the API app, exposed at /metrics (see admin blueprint).
+    METRICS_MULTIPROC_DIR enables aggregation across gunicorn workers.
+    """
+
+    def __init__(self, app=None) -> None:
+        self._last_dump = 0.0
+        self._pool_totals = {}  # last pool stats read, DB_POOL_EVENTS gets the difference
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_MULTIPROC_DIR", None)
+        app.config.setdefault("METRICS_DUMP_INTERVAL", 5)
+
+        if not app.config["METRICS_ENABLED"]:
+            return None
+
+        self.multiproc_dir = app.config["METRICS_MULTIPROC_DIR"]
+        self.dump_interval = app.config["METRICS_DUMP_INTERVAL"]
+        if self.multiproc_dir:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+
+        app.extensions["metrics"] = self
+        timing.add_observer(_observe_span)
+        app.before_request(self._start)
+        app.after_request(self._record)
+        app.teardown_request(self._finish)
+        return None
+
+    @staticmethod
+    def _start() -> None:
+        g.metrics_start = time.perf_counter()
+        g.metrics_in_flight = True
+        REQUESTS_IN_FLIGHT.inc()
+
+    def _record(self, response):
+        start = g.pop("metrics_start", None)
+        if start is not None:
+            endpoint = request.endpoint or "not_found"
+            REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method)
+            REQUESTS_TOTAL.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+
+        if self.multiproc_dir and time.monotonic() - self._last_dump > self.dump_interval:
+            self._last_dump = time.monotonic()
+            registry.dump(self.multiproc_dir)
+
+        return response
+
+    @staticmethod
+    def _finish(exc=None) -> None:
+        if g.pop("metrics_in_flight", False):
+            REQUESTS_IN_FLIGHT.dec()
+
+    def render(self) -> str:
+        """updates scrape-time gauges and renders all workers metrics"""
+        status = pool_status(db.engine)
+        for state in ("size", "checked_out", "checked_in", "overflow", "saturation"):
+            if status.get(state) is not None:
+                DB_POOL.set(status[state], state=state)
+        for event in ("checkouts", "checkout_timeouts", "connects", "invalidations", "checkout_wait_total_ms"):
+            if event in status:
+                total, last = status[event], self._pool_totals.get(event, 0)
+                # a new pool (engine disposed after fork) starts again from 0
+                DB_POOL_EVENTS.inc(total - last if total >= last else total, event=event)
+                self._pool_totals[event] = total
+
+        return registry.render(self.multiproc_dir)
@@ -0,0 +1,175 @@
+import json, logging, threading, time
+import click
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from api.extensions import db
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """counters of a connection pool, kept across pool recreation (engine.dispose)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0  # seconds
+        self.checkout_wait_max = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+
+    def add_checkout(self, wait: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+
+    def incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def serialize(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "checkout_wait_total_ms": round(self.checkout_wait_total * 1000, 2),
+            "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 2),
+            "checkout_timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+        }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait time and timeouts in PoolStats"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.stats.incr("timeouts")
+            raise
+
+        self.stats.add_checkout(time.perf_counter() - start)
+        return conn
+
+    def recreate(self) -> QueuePool:
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+def pool_status(engine) -> dict:
+    """current state of the engine pool, with saturation and PoolStats counters"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    rv = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        rv.update(stats.serialize())
+
+    return rv
+
+
+def warm_pool(engine, connections: int) -> int:
+    """
+    opens 'connections' connections and returns them to the pool,
+    so the first requests of the worker don't pay the connection setup.
+    returns the number of connections opened.
+    """
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    except exc.SQLAlchemyError as e:
+        logger.warning("pool warmup stopped after %s connections: %s", len(opened), e)
+    finally:
+        for conn in opened:
+            conn.close()
+
+    return len(opened)
+
+
+class PoolMonitor:
+    """
+    pool instrumentation for the db engine.
+    - counts new connections and invalidations.
+    - sets postgres statement_timeout on new connections (DB_STATEMENT_TIMEOUT).
+    - opens DB_POOL_WARMUP connections at start.
+    - flask cli: `flask pool-status`
+    must be initialized after db.init_app(app)
+    """
+
+    def __init__(self, app=None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("DB_STATEMENT_TIMEOUT", 0)
+        app.config.setdefault("DB_POOL_WARMUP", 0)
+
+        with app.app_context():
+            engine = db.engine
+
+        statement_timeout = app.config["DB_STATEMENT_TIMEOUT"]
+
+        def on_connect(dbapi_connection, connection_record):
+            stats = getattr(engine.pool, "stats", None)
+            if stats is not None:
+                stats.incr("connects")
+
+            if statement_timeout and engine.dialect.name == "postgresql":
+                # outside a transaction, the rollback of the pool reset would undo the SET
+                autocommit = dbapi_connection.autocommit
+                dbapi_connection.autocommit = True
+                try:
+                    cursor = dbapi_connection.cursor()
+                    cursor.execute(f"SET statement_timeout = {int(statement_timeout)}")
+                    cursor.close()
+                finally:
+                    dbapi_connection.autocommit = autocommit
+
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            stats = getattr(engine.pool, "stats", None)
+            if stats is not None:
+                stats.incr("invalidations")
+            logger.warning("db connection invalidated: %s", exception)
+
+        def on_soft_invalidate(dbapi_connection, connection_record, exception):
+            stats = getattr(engine.pool, "stats", None)
+            if stats is not None:
+                stats.incr("soft_invalidations")
+
+        event.listen(engine, "connect", on_connect)
+        event.listen(engine, "invalidate", on_invalidate)
+        event.listen(engine, "soft_invalidate", on_soft_invalidate)
+
+        @app.cli.command("pool-status")
+        def pool_status_command():
+            """show db pool status and counters"""
+            click.echo(json.dumps(pool_status(engine), indent=2))
+
+        if app.config["DB_POOL_WARMUP"]:
+            warm_pool(engine, app.config["DB_POOL_WARMUP"])
+
+        return None
@@ -0,0 +1,172 @@
+import cProfile, os, random, sys, threading, time
+from collections import Counter
+import click
+from flask import current_app, g, request
+from itsdangerous import BadSignature, SignatureExpired, TimestampSigner
+
+
+class StackSampler:
+    """
+    statistical profiler: samples the stack of one thread every 'interval' seconds
+    and counts collapsed stacks (flamegraph.pl / speedscope format).
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def enable(self) -> None:
+        self._thread.start()
+
+    def disable(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """
+    profiles single requests of the API app.
+    a request is profiled when:
+    - it carries a valid signed X-Profile-Request header (see `flask profiler token`), or
+    - it is picked by PROFILER_SAMPLE_RATE.
+    PROFILER_MODE "cprofile" writes .pstats files, "sampler" writes collapsed stacks.
+    only the last PROFILER_MAX_FILES profiles are kept in PROFILER_DIR.
+    when PROFILER_ENABLED is False no hook is registered.
+    """
+
+    HEADER = "X-Profile-Request"
+    SALT = "profile-request"
+
+    def __init__(self, app=None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("PROFILER_ENABLED", False)
+        app.config.setdefault("PROFILER_SAMPLE_RATE", 0.0)
+        app.config.setdefault("PROFILER_MODE", "cprofile")
+        app.config.setdefault("PROFILER_DIR", "/tmp/estokealo-profiles")
+        app.config.setdefault("PROFILER_MAX_FILES", 50)
+        app.config.setdefault("PROFILER_TOKEN_MAX_AGE", 3600)
+
+        self._register_cli(app)
+        if not app.config["PROFILER_ENABLED"]:
+            return None
+
+        os.makedirs(app.config["PROFILER_DIR"], exist_ok=True)
+        app.before_request(self._start)
+        app.teardown_request(self._stop)
+        return None
+
+    @classmethod
+    def _signer(cls, app) -> TimestampSigner:
+        return TimestampSigner(app.config["SECRET_KEY"], salt=cls.SALT)
+
+    @classmethod
+    def create_token(cls, app) -> str:
+        return cls._signer(app).sign("profile").decode("utf-8")
+
+    @classmethod
+    def _valid_header(cls, value: str) -> bool:
+        try:
+            cls._signer(current_app).unsign(value, max_age=current_app.config["PROFILER_TOKEN_MAX_AGE"])
+        except (BadSignature, SignatureExpired):
+            return False
+
+        return True
+
+    def _start(self) -> None:
+        config = current_app.config
+        header = request.headers.get(self.HEADER)
+        if header is not None:
+            if not self._valid_header(header):
+                return None
+        elif not (config["PROFILER_SAMPLE_RATE"] and random.random() < config["PROFILER_SAMPLE_RATE"]):
+            return None
+
+        if config["PROFILER_MODE"] == "sampler":
+            profiler = StackSampler(threading.get_ident())
+        else:
+            profiler = cProfile.Profile()
+
+        g.request_profiler = (profiler, time.perf_counter())
+        profiler.enable()
+        return None
+
+    def _stop(self, exc=None) -> None:
+        item = g.pop("request_profiler", None)
+        if item is None:
+            return None
+
+        profiler, start = item
+        profiler.disable()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        config = current_app.config
+        endpoint = (request.endpoint or "not_found").replace(".", "-")
+        extension = "collapsed" if isinstance(profiler, StackSampler) else "pstats"
+        filename = f"{int(time.time() * 1000)}_{endpoint}_{duration_ms:.0f}ms.{extension}"
+
+        if isinstance(profiler, StackSampler):
+            profiler.dump(os.path.join(config["PROFILER_DIR"], filename))
+        else:
+            profiler.dump_stats(os.path.join(config["PROFILER_DIR"], filename))
+
+        self._prune(config["PROFILER_DIR"], config["PROFILER_MAX_FILES"])
+        return None
+
+    @staticmethod
+    def _prune(directory: str, max_files: int) -> None:
+        """keeps the newest 'max_files' profiles"""
+        files = sorted(
+            (os.path.join(directory, f) for f in os.listdir(directory)),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for path in files[max_files:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _register_cli(self, app) -> None:
+        @app.cli.group("profiler")
+        def profiler_group():
+            """request profiler commands"""
+
+        @profiler_group.command("token")
+        def token_command():
+            """signed value for the X-Profile-Request header"""
+            click.echo(self.create_token(app))
+
+        @profiler_group.command("list")
+        def list_command():
+            """stored profiles, newest first"""
+            directory = app.config["PROFILER_DIR"]
+            if not os.path.isdir(directory):
+                return
+            for f in sorted(os.listdir(directory), reverse=True):
+                click.echo(os.path.join(directory, f))
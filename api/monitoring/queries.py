@@ -0,0 +1,153 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, request
+from sqlalchemy import event
+from api.extensions import db
+
+
+_current_stats: ContextVar = ContextVar("query_stats", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """raised in testing mode when an endpoint issues more queries than its budget"""
+
+
+class QueryStats:
+    """queries executed during a request (or inside a count_queries() block)"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_time = 0.0  # seconds
+        self.statements = Counter()
+
+    def __repr__(self) -> str:
+        return f"QueryStats(count={self.count}, total_time={self.total_time:.4f})"
+
+    def add(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """identical statements executed 'threshold' times or more (N+1 candidates)"""
+        return {s: n for s, n in self.statements.items() if n >= threshold}
+
+    def serialize(self) -> dict:
+        return {"count": self.count, "db_time_ms": round(self.total_time * 1000, 2)}
+
+
+def query_budget(max_queries: int):
+    """
+    declares the max number of queries an endpoint is expected to issue.
+    overrides QUERY_BUDGET config for the decorated view.
+    """
+
+    def decorator(fn):
+        fn.query_budget = max_queries
+        return fn
+
+    return decorator
+
+
+def current_stats() -> QueryStats | None:
+    return _current_stats.get()
+
+
+@contextmanager
+def count_queries():
+    """
+    counts the queries executed inside the block.
+        with count_queries() as stats:
+            ...
+        assert stats.count <= 3
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(statement, time.perf_counter() - start)
+
+
+class QueryCounter:
+    """
+    counts the queries and db time of each request, using sqlalchemy engine events.
+    - logs endpoints that exceed their query budget.
+    - logs repeated identical statements (N+1 candidates).
+    - raises QueryBudgetExceeded when QUERY_BUDGET_RAISE is set (testing).
+    """
+
+    def __init__(self, app=None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("QUERY_COUNTER_ENABLED", True)
+        app.config.setdefault("QUERY_BUDGET", 20)
+        app.config.setdefault("QUERY_REPEAT_THRESHOLD", 5)
+        app.config.setdefault("QUERY_BUDGET_RAISE", False)
+
+        if not app.config["QUERY_COUNTER_ENABLED"]:
+            return None
+
+        with app.app_context():
+            engine = db.engine
+
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+        app.before_request(self._start)
+        app.after_request(self._check)
+        app.teardown_request(self._stop)
+        return None
+
+    @staticmethod
+    def _start() -> None:
+        _current_stats.set(QueryStats())
+
+    @staticmethod
+    def _stop(exc=None) -> None:
+        _current_stats.set(None)
+
+    @staticmethod
+    def _check(response):
+        stats = _current_stats.get()
+        if stats is None:
+            return response
+
+        config = current_app.config
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, "query_budget", config["QUERY_BUDGET"])
+        repeated = stats.repeated(config["QUERY_REPEAT_THRESHOLD"])
+
+        for statement, times in repeated.items():
+            current_app.logger.warning(
+                "possible N+1 in %s: statement executed %s times: %s",
+                request.endpoint, times, " ".join(statement.split())[:300],
+            )
+
+        if stats.count > budget:
+            msg = (
+                f"{request.endpoint} executed {stats.count} queries "
+                f"({stats.total_time * 1000:.1f} ms), budget is {budget}"
+            )
+            if config["QUERY_BUDGET_RAISE"]:
+                raise QueryBudgetExceeded(msg)
+
+            current_app.logger.warning(msg)
+
+        return response
@@ -0,0 +1,140 @@
+import json, logging, random, threading, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import click
+from flask import has_request_context, request
+from sqlalchemy import event
+from api.extensions import db
+from api.utils import helpers as h
+
+
+logger = logging.getLogger(__name__)
+
+
+def parameter_shape(parameters) -> object:
+    """
+    replaces bound values with their type names, so slow statements can be
+    logged without leaking user data. lists are summarized by length.
+    """
+    if isinstance(parameters, dict):
+        return {k: parameter_shape(v) for k, v in parameters.items()}
+
+    if isinstance(parameters, (list, tuple)):
+        if len(parameters) > 5:
+            return f"{type(parameters).__name__}[{len(parameters)}]"
+        return [parameter_shape(v) for v in parameters]
+
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """
+    records statements slower than SLOW_QUERY_THRESHOLD_MS in a ring buffer.
+    for a SLOW_QUERY_EXPLAIN_RATE fraction of them, runs EXPLAIN (ANALYZE, BUFFERS)
+    in a background thread, on a separate connection (postgres only, select statements only).
+    - flask cli: `flask slow-queries [--clear]`
+    - admin endpoint: GET /admin/slow-queries
+    """
+
+    def __init__(self, app=None) -> None:
+        self.records = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("SLOW_QUERY_ENABLED", True)
+        app.config.setdefault("SLOW_QUERY_THRESHOLD_MS", 200)
+        app.config.setdefault("SLOW_QUERY_EXPLAIN_RATE", 0.0)
+        app.config.setdefault("SLOW_QUERY_BUFFER_SIZE", 200)
+
+        if not app.config["SLOW_QUERY_ENABLED"]:
+            return None
+
+        app.extensions["slow_query_log"] = self
+        self.records = deque(maxlen=app.config["SLOW_QUERY_BUFFER_SIZE"])
+        self.threshold = app.config["SLOW_QUERY_THRESHOLD_MS"] / 1000
+        self.explain_rate = app.config["SLOW_QUERY_EXPLAIN_RATE"]
+
+        with app.app_context():
+            engine = db.engine
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+        def after_execute(conn, cursor, statement, parameters, context, executemany):
+            duration = time.perf_counter() - conn.info["slow_query_start"].pop()
+            if duration >= self.threshold:
+                self.record(engine, statement, parameters, duration, executemany)
+
+        event.listen(engine, "before_cursor_execute", before_execute)
+        event.listen(engine, "after_cursor_execute", after_execute)
+
+        @app.cli.command("slow-queries")
+        @click.option("--clear", is_flag=True, help="empty the buffer after printing")
+        def slow_queries_command(clear):
+            """print statements recorded by the slow query log"""
+            click.echo(json.dumps(self.serialize(), indent=2))
+            if clear:
+                self.clear()
+
+        return None
+
+    def record(self, engine, statement: str, parameters, duration: float, executemany: bool = False) -> None:
+        item = {
+            "statement": " ".join(statement.split()),
+            "parameters": parameter_shape(parameters),
+            "duration_ms": round(duration * 1000, 2),
+            "endpoint": request.endpoint if has_request_context() else None,
+            "recorded_at": h.datetime_formatter(datetime.utcnow()),
+            "explain": None,
+        }
+        with self._lock:
+            self.records.append(item)
+
+        logger.warning(
+            "slow query (%s ms) in %s: %s", item["duration_ms"], item["endpoint"], item["statement"][:300]
+        )
+
+        if (
+            self.explain_rate
+            and not executemany
+            and engine.dialect.name == "postgresql"
+            and item["statement"].lower().startswith("select")
+            and random.random() < self.explain_rate
+        ):
+            self._submit_explain(engine, statement, parameters, item)
+
+    def after_fork(self) -> None:
+        """executor threads and locks of the parent are not usable in a forked worker"""
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _submit_explain(self, engine, statement, parameters, item: dict) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+        self._executor.submit(self._explain, engine, statement, parameters, item)
+
+    @staticmethod
+    def _explain(engine, statement, parameters, item: dict) -> None:
+        try:
+            with engine.connect() as conn:
+                # ANALYZE executes the statement; it is limited to select statements
+                # and rolled back when the connection is returned to the pool.
+                raw = conn.connection.cursor()
+                raw.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+                item["explain"] = raw.fetchone()[0]
+                raw.close()
+        except Exception as e:  # explain is best effort, never raises
+            item["explain"] = {"error": str(e)}
+
+    def serialize(self) -> list[dict]:
+        with self._lock:
+            return list(self.records)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
@@ -0,0 +1,150 @@
+import functools, logging, time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, request
+from api.monitoring.queries import current_stats
+
+
+logger = logging.getLogger(__name__)
+_current_timings: ContextVar = ContextVar("request_timings", default=None)
+_observers = []  # functions called with (span name, duration) for every span
+
+
+class RequestTimings:
+    """time spent by a request in each span (db, redis, email, validation, etc.)"""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.spans = {}  # name: [total seconds, count]
+
+    def __repr__(self) -> str:
+        return f"RequestTimings(spans={list(self.spans)})"
+
+    def add(self, name: str, duration: float) -> None:
+        item = self.spans.setdefault(name, [0.0, 0])
+        item[0] += duration
+        item[1] += 1
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.start
+
+    def serialize(self) -> dict:
+        return {
+            name: {"ms": round(total * 1000, 2), "count": count}
+            for name, (total, count) in self.spans.items()
+        }
+
+    def server_timing(self) -> str:
+        """Server-Timing header value"""
+        items = [
+            f'{name};dur={total * 1000:.2f};desc="{count}x"'
+            for name, (total, count) in self.spans.items()
+        ]
+        items.append(f"total;dur={self.total * 1000:.2f}")
+        return ", ".join(items)
+
+
+@contextmanager
+def span(name: str):
+    """
+    adds the time spent in the block to the current request span 'name'.
+    outside a request (cli, workers) only the observers are notified.
+    """
+    timings = _current_timings.get()
+    if timings is None and not _observers:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        if timings is not None:
+            timings.add(name, duration)
+        for observer in _observers:
+            observer(name, duration)
+
+
+def add_observer(fn) -> None:
+    """registers fn(name, duration), called at the end of every span"""
+    if fn not in _observers:
+        _observers.append(fn)
+
+
+def timed(name: str):
+    """decorator version of span()"""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class RequestTimer:
+    """
+    collects spans for each request and reports them:
+    - Server-Timing response header, when SERVER_TIMING_HEADER is set.
+    - one structured log line per request, when TIMING_LOG is set.
+    db time is taken from the query counter of the request.
+    """
+
+    def __init__(self, app=None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("SERVER_TIMING_HEADER", False)
+        app.config.setdefault("TIMING_LOG", True)
+
+        if not (app.config["SERVER_TIMING_HEADER"] or app.config["TIMING_LOG"]):
+            return None
+
+        app.before_request(self._start)
+        app.after_request(self._report)
+        app.teardown_request(self._stop)
+        return None
+
+    @staticmethod
+    def _start() -> None:
+        _current_timings.set(RequestTimings())
+
+    @staticmethod
+    def _stop(exc=None) -> None:
+        _current_timings.set(None)
+
+    @staticmethod
+    def _report(response):
+        timings = _current_timings.get()
+        if timings is None:
+            return response
+
+        stats = current_stats()
+        if stats is not None and stats.count:
+            timings.spans["db"] = [stats.total_time, stats.count]
+
+        if current_app.config["SERVER_TIMING_HEADER"]:
+            response.headers["Server-Timing"] = timings.server_timing()
+
+        if current_app.config["TIMING_LOG"]:
+            logger.info(
+                "request timing",
+                extra={
+                    "data": {
+                        "event": "request_timing",
+                        "method": request.method,
+                        "endpoint": request.endpoint,
+                        "status": response.status_code,
+                        "total_ms": round(timings.total * 1000, 2),
+                        "spans": timings.serialize(),
+                    }
+                },
+            )
+
+        return response
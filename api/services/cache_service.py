@@ -0,0 +1,193 @@
+import json, threading, time
+from collections import OrderedDict
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect, select
+from api.extensions import db
+from api.models.main import Company, Role, User
+from api.services.redis_service import RedisClient
+from api.monitoring.timing import span
+
+
+class LocalLRU:
+    """
+    small in-process LRU with per-item expiration.
+    each gunicorn worker has its own instance, so items must live only a few seconds.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 5.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[bool, object]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False, None
+
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return False, None
+
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value, ttl: float = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class PublicInfoCache:
+    """
+    cache for User.serialize_public_info(), keyed by normalized email.
+    - level 1: LocalLRU in the worker.
+    - level 2: shared redis store.
+    users not found are cached as negative results with a short ttl.
+    """
+
+    PREFIX = "user_public:"
+    SESSION_KEY = "user_public_invalidate"
+    local = LocalLRU()
+
+    def __init__(self) -> None:
+        config = current_app.config
+        self.enabled = config.get("PUBLIC_INFO_CACHE_ENABLED", True)
+        self.ttl = config.get("PUBLIC_INFO_CACHE_TTL", 300)
+        self.negative_ttl = config.get("PUBLIC_INFO_CACHE_NEGATIVE_TTL", 30)
+
+    @classmethod
+    def _key(cls, email: str) -> str:
+        return f"{cls.PREFIX}{email}"
+
+    def get(self, email: str) -> tuple[bool, dict | None]:
+        """
+        returns tuple -> (found:bool, user_public:dict|None)
+        found=True with None as value is a cached negative result.
+        """
+        if not self.enabled:
+            return False, None
+
+        key = self._key(email)
+        found, value = self.local.get(key)
+        if found:
+            return True, value
+
+        try:
+            with span("redis"):
+                raw = RedisClient().set_connection().get(key)
+        except RedisError:
+            return False, None
+
+        if raw is None:
+            return False, None
+
+        value = json.loads(raw)
+        self.local.set(key, value, ttl=self.negative_ttl if value is None else None)
+        return True, value
+
+    def set(self, email: str, user_public: dict | None) -> None:
+        if not self.enabled:
+            return None
+
+        key = self._key(email)
+        ttl = self.ttl if user_public is not None else self.negative_ttl
+        self.local.set(key, user_public, ttl=ttl)
+        try:
+            with span("redis"):
+                RedisClient().set_connection().set(key, json.dumps(user_public), ex=ttl)
+        except RedisError:
+            pass
+
+        return None
+
+    @classmethod
+    def invalidate(cls, *emails: str) -> None:
+        keys = [cls._key(e) for e in emails if e]
+        if not keys:
+            return None
+
+        cls.local.delete(*keys)
+        try:
+            RedisClient().set_connection().delete(*keys)
+        except RedisError:
+            pass
+
+        return None
+
+
+def _emails_to_invalidate(session) -> set:
+    """collect emails of every public profile affected by the current flush"""
+    emails, user_ids, company_ids = set(), set(), set()
+
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, User):
+            history = inspect(obj).attrs._email.history
+            emails.update(e for e in (*history.deleted, obj._email) if e)
+
+        elif isinstance(obj, Role):
+            user_ids.add(obj.user_id or getattr(obj.user, "id", None))
+
+        elif isinstance(obj, Company) and obj in session.dirty:
+            attrs = inspect(obj).attrs
+            if attrs.name.history.has_changes() or attrs._logo.history.has_changes():
+                company_ids.add(obj.id)
+
+    user_ids.discard(None)
+    if user_ids:
+        emails.update(session.execute(select(User._email).where(User.id.in_(user_ids))).scalars())
+
+    if company_ids:
+        emails.update(
+            session.execute(
+                select(User._email).join(User.roles).where(Role.company_id.in_(company_ids))
+            ).scalars()
+        )
+
+    return emails
+
+
+def _after_flush(session, flush_context) -> None:
+    emails = _emails_to_invalidate(session)
+    if emails:
+        session.info.setdefault(PublicInfoCache.SESSION_KEY, set()).update(emails)
+
+
+def _after_commit(session) -> None:
+    emails = session.info.pop(PublicInfoCache.SESSION_KEY, None)
+    if emails:
+        PublicInfoCache.invalidate(*emails)
+
+
+def _after_rollback(session) -> None:
+    session.info.pop(PublicInfoCache.SESSION_KEY, None)
+
+
+def init_public_info_cache(app) -> None:
+    """register write-through invalidation of the public info cache on db.session"""
+    app.config.setdefault("PUBLIC_INFO_CACHE_ENABLED", True)
+    PublicInfoCache.local.maxsize = app.config.get("PUBLIC_INFO_CACHE_LOCAL_SIZE", 1024)
+    PublicInfoCache.local.ttl = app.config.get("PUBLIC_INFO_CACHE_LOCAL_TTL", 5)
+
+    for name, fn in (
+        ("after_flush", _after_flush),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(db.session, name, fn):
+            event.listen(db.session, name, fn)
@@ -0,0 +1,122 @@
+from sqlalchemy import and_, func, insert, or_, select, text
+from api.extensions import db
+from api.models.main import ChangeFeed, Company, Role, User
+from api.utils.enums import OperationStatus
+
+FEED_LOCK_ID = 7312  # pg advisory lock that orders the feed writers
+
+
+def _lock_feed() -> None:
+    """
+    sequence numbers are taken in commit order: writers of the feed wait for each other
+    until commit (transaction level advisory lock), so a client never skips a row that
+    was committed after a higher sequence number it already read.
+    """
+    if db.session.get_bind().dialect.name == "postgresql":
+        db.session.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": FEED_LOCK_ID})
+
+
+def record_changes(rows: list[dict]) -> None:
+    """
+    adds feed rows to the current transaction, call it right before db.session.commit().
+    rows: {"entity", "entity_id", "op", "user_id", "company_id"}
+    """
+    if not rows:
+        return None
+
+    _lock_feed()
+    db.session.execute(insert(ChangeFeed), [{"op": "upsert", "user_id": None, "company_id": None, **r} for r in rows])
+    return None
+
+
+def record_role(role: Role, op: str = "upsert") -> None:
+    if role.id is None:
+        db.session.flush()  # new role, the id is needed in the feed
+
+    record_changes([{
+        "entity": "role", "entity_id": role.id, "op": op, "user_id": role.user_id, "company_id": role.company_id,
+    }])
+
+
+def record_company(company: Company) -> None:
+    record_changes([{"entity": "company", "entity_id": company.id, "company_id": company.id}])
+
+
+def record_user(user: User) -> None:
+    """a profile change is shown in the users list of every company of the user"""
+    company_ids = db.session.execute(select(Role.company_id).where(Role.user_id == user.id)).scalars()
+    record_changes([
+        {"entity": "user", "entity_id": user.id, "user_id": user.id, "company_id": company_id}
+        for company_id in company_ids
+    ])
+
+
+def changes_since(since: int, user_id: int, company_id: int = None, limit: int = 500) -> dict:
+    """
+    changes after the 'since' cursor visible to the user (own roles, companies where the user
+    is an active member) and, with company_id (admins), to the company (roles, members, company).
+    repeated changes of an entity are merged in the last one.
+    returns None when the cursor is older than the retained feed (the client must reload).
+    """
+    oldest = db.session.execute(select(func.min(ChangeFeed.id))).scalar()
+    if since and oldest is not None and since < oldest - 1:
+        return None
+
+    own_companies = select(Role.company_id).where(
+        Role.user_id == user_id,
+        Role._inv_status == OperationStatus.ACCEPTED.value,
+        Role._is_active.is_(True),
+    ).scalar_subquery()  # pending, rejected or disabled memberships only get their own role rows
+    audience = [
+        and_(ChangeFeed.user_id == user_id, ChangeFeed.entity == "role"),
+        and_(ChangeFeed.entity == "company", ChangeFeed.company_id.in_(own_companies)),
+    ]
+    if company_id is not None:
+        audience.append(ChangeFeed.company_id == company_id)
+
+    rows = db.session.execute(
+        select(ChangeFeed).where(ChangeFeed.id > since, or_(*audience)).order_by(ChangeFeed.id).limit(limit + 1)
+    ).scalars().all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest = {}  # (entity, entity_id): row, in sequence order
+    for row in rows:
+        latest.pop((row.entity, row.entity_id), None)
+        latest[(row.entity, row.entity_id)] = row
+
+    return {
+        "changes": _serialize(list(latest.values()), company_id),
+        "cursor": rows[-1].id if rows else since,
+        "has_more": has_more,
+    }
+
+
+def _serialize(rows: list[ChangeFeed], company_id: int = None) -> list[dict]:
+    """current state of every changed entity, loaded with one query per entity type"""
+    ids = {"role": set(), "company": set(), "user": set()}
+    for row in rows:
+        if row.op != "delete":
+            ids[row.entity].add(row.entity_id)
+
+    loaded = {
+        "role": {r.id: r for r in db.session.query(Role).filter(Role.id.in_(ids["role"]))} if ids["role"] else {},
+        "company": {c.id: c for c in db.session.query(Company).filter(Company.id.in_(ids["company"]))} if ids["company"] else {},
+        "user": {u.id: u for u in db.session.query(User).filter(User.id.in_(ids["user"]))} if ids["user"] else {},
+    }
+
+    changes = []
+    for row in rows:
+        item = {"seq": row.id, "entity": row.entity, "id": row.entity_id, "op": row.op, "data": None}
+        obj = loaded[row.entity].get(row.entity_id) if row.op != "delete" else None
+        if obj is None:
+            item["op"] = "delete"  # deleted after the change was recorded
+        elif row.entity == "role":
+            item["data"] = {**obj.serialize_with_user(), "user": obj.user.serialize()}
+        elif row.entity == "company":
+            item["data"] = obj.serialize_all() if obj.id == company_id else obj.serialize()
+        else:
+            item["data"] = obj.serialize()
+        changes.append(item)
+
+    return changes
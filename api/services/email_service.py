@@ -1,5 +1,33 @@
-import os, requests
+import os, logging, threading, requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from api.monitoring.timing import timed
+from api.monitoring.metrics import EMAIL_ERRORS
+
+logger = logging.getLogger(__name__)
+_sessions = {}  # pid: requests.Session, keep-alive connections to the smtp api
+_sessions_lock = threading.Lock()
+
+
+def http_session() -> requests.Session:
+    """
+    session of the worker process, its pool allows EMAIL_POOL_SIZE concurrent requests
+    (threads or greenlets) to reuse their connections.
+    """
+    pid = os.getpid()
+    session = _sessions.get(pid)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(pid)
+            if session is None:
+                pool_size = int(os.environ.get("EMAIL_POOL_SIZE", 20))
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+                session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+                _sessions.clear()  # sessions of the parent process after fork
+                _sessions[pid] = session
+
+    return session
 
 
 class Email_api_service:
@@ -46,6 +74,7 @@ class Email_api_service:
             "htmlContent": self.content,
         }
 
+    @timed("email")
     def send_email(self) -> tuple[bool, dict]:
         """
         SMTP API request function
@@ -53,16 +82,21 @@ class Email_api_service:
         * (success:bool, msg:str)
         """
         if self.EMAIL_SERVICE_MODE == "development":
-            print(self.content)
+            logger.info(
+                "email not sent, development mode",
+                extra={"data": {"email_to": self.email_to, "subject": self.subject, "content": self.content}},
+            )
             return True, {self.SERVICE_NAME: "email was printed in console"}
 
         try:
-            r = requests.post(
+            r = http_session().post(
                 headers=self.headers, json=self.body, url=self.SMTP_API_URL, timeout=3
             )
             r.raise_for_status()
 
         except RequestException as e:
+            EMAIL_ERRORS.inc()
+            logger.warning("email api error: %s", e, extra={"data": {"event": "email_error"}})
             return False, {self.SERVICE_NAME: f"{self.ERROR_MSG} - {e}"}
 
         return True, {self.SERVICE_NAME: f"email was sent to: [{self.email_to}]"}
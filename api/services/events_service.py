@@ -0,0 +1,90 @@
+import json, logging, time
+from flask import Response, current_app
+from redis.exceptions import RedisError
+from api.services.redis_service import RedisClient
+from api.monitoring.timing import span
+
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """
+    invitation and membership events, fanned out to every worker with redis pub/sub.
+    - channels: events:user:<user_id> (the invited/affected user) and
+      events:company:<company_id> (the company admins).
+    - events are published after the db commit, they are notifications: a client that
+      reconnects reloads the data it shows, missed events are not replayed.
+    """
+
+    PREFIX = "events:"
+
+    @classmethod
+    def user_channel(cls, user_id: int) -> str:
+        return f"{cls.PREFIX}user:{user_id}"
+
+    @classmethod
+    def company_channel(cls, company_id: int) -> str:
+        return f"{cls.PREFIX}company:{company_id}"
+
+    @classmethod
+    def publish(cls, event: str, data: dict, user_id: int = None, company_id: int = None) -> None:
+        message = json.dumps({"event": event, "data": data, "ts": time.time()})
+        channels = []
+        if user_id is not None:
+            channels.append(cls.user_channel(user_id))
+        if company_id is not None:
+            channels.append(cls.company_channel(company_id))
+
+        try:
+            rdb = RedisClient().set_connection()
+            with span("redis"):
+                for channel in channels:
+                    rdb.publish(channel, message)
+        except RedisError as e:
+            logger.warning("event %s not published: %s", event, e)
+
+        return None
+
+
+def sse_stream(channels: list[str], heartbeat: float = 15, max_duration: float = 300, retry_ms: int = 3000):
+    """
+    generator of server-sent events for 'channels'. it holds no db connection or request
+    context, only a redis pub/sub connection. a comment line is sent every 'heartbeat'
+    seconds so proxies keep the connection open, the stream ends after 'max_duration'
+    seconds and the client reconnects after 'retry_ms'.
+    """
+    pubsub = None
+    deadline = time.monotonic() + max_duration
+    try:
+        pubsub = RedisClient().set_connection().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(*channels)
+        yield f"retry: {retry_ms}\n\n"
+        while time.monotonic() < deadline:
+            message = pubsub.get_message(timeout=min(heartbeat, max(deadline - time.monotonic(), 0)))
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+
+            payload = json.loads(message["data"])
+            yield f"event: {payload['event']}\ndata: {json.dumps(payload['data'])}\n\n"
+    except RedisError as e:
+        logger.warning("event stream closed: %s", e)
+    finally:
+        if pubsub is not None:
+            pubsub.close()
+
+
+def sse_response(channels: list[str]) -> Response:
+    config = current_app.config
+    response = Response(
+        sse_stream(
+            channels,
+            heartbeat=config.get("SSE_HEARTBEAT", 15),
+            max_duration=config.get("SSE_MAX_DURATION", 300),
+            retry_ms=config.get("SSE_RETRY_MS", 3000),
+        ),
+        mimetype="text/event-stream",
+    )
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # nginx must not buffer the stream
+    return response
@@ -0,0 +1,90 @@
+import hashlib, json, time
+from flask import current_app, request, Response
+from redis.exceptions import RedisError
+from api.services.redis_service import RedisClient
+from api.monitoring.timing import span
+
+
+class IdempotencyStore:
+    """
+    responses of mutating requests sent with an Idempotency-Key header, stored in redis.
+    - the key is scoped by method, path and Authorization header, so a key can't be used
+      to read the response of another client.
+    - a request body different from the first one under the same key is rejected.
+    - while the first request runs the key holds an 'in_flight' marker (IDEMPOTENCY_LOCK_TTL),
+      duplicates wait for the stored response up to IDEMPOTENCY_WAIT seconds.
+    """
+
+    PREFIX = "idempotency:"
+    HEADER = "Idempotency-Key"
+    REPLAY_HEADER = "Idempotent-Replayed"
+    POLL_INTERVAL = 0.05  # seconds between checks of an in-flight request
+    STORED_HEADERS = ("Content-Type", "Location")
+
+    def __init__(self) -> None:
+        config = current_app.config
+        self.enabled = config.get("IDEMPOTENCY_ENABLED", True)
+        self.ttl = config.get("IDEMPOTENCY_TTL", 86400)
+        self.lock_ttl = config.get("IDEMPOTENCY_LOCK_TTL", 30)
+        self.wait = config.get("IDEMPOTENCY_WAIT", 10)
+        self.rdb = RedisClient().set_connection()
+
+    @classmethod
+    def key_for(cls, idempotency_key: str) -> str:
+        scope = "\n".join(
+            (request.method, request.path, request.headers.get("Authorization", ""), idempotency_key)
+        )
+        return f"{cls.PREFIX}{hashlib.sha256(scope.encode()).hexdigest()}"
+
+    @staticmethod
+    def fingerprint() -> str:
+        return hashlib.sha256(request.get_data()).hexdigest()
+
+    def acquire(self, key: str, fingerprint: str) -> bool:
+        """True when this request is the first one with the key and must run"""
+        marker = json.dumps({"status": "in_flight", "fingerprint": fingerprint})
+        with span("redis"):
+            return bool(self.rdb.set(key, marker, nx=True, ex=self.lock_ttl))
+
+    def get(self, key: str) -> dict | None:
+        with span("redis"):
+            raw = self.rdb.get(key)
+
+        return json.loads(raw) if raw is not None else None
+
+    def wait_for(self, key: str) -> dict | None:
+        """
+        returns the stored record once it is no longer in flight, or the last in-flight record
+        after IDEMPOTENCY_WAIT seconds. None when the key was released (failed request).
+        """
+        deadline = time.monotonic() + self.wait
+        record = self.get(key)
+        while record is not None and record["status"] == "in_flight" and time.monotonic() < deadline:
+            time.sleep(self.POLL_INTERVAL)
+            record = self.get(key)
+
+        return record
+
+    def save(self, key: str, fingerprint: str, response: Response) -> None:
+        record = {
+            "status": "done",
+            "fingerprint": fingerprint,
+            "status_code": response.status_code,
+            "headers": {h: response.headers[h] for h in self.STORED_HEADERS if h in response.headers},
+            "body": response.get_data(as_text=True),
+        }
+        with span("redis"):
+            self.rdb.set(key, json.dumps(record), ex=self.ttl)
+
+    def release(self, key: str) -> None:
+        """lets a retry run the request again, after errors that must not be replayed"""
+        try:
+            self.rdb.delete(key)
+        except RedisError:
+            pass
+
+    @classmethod
+    def replay(cls, record: dict) -> Response:
+        response = Response(record["body"], status=record["status_code"], headers=record["headers"])
+        response.headers[cls.REPLAY_HEADER] = "true"
+        return response
@@ -1,17 +1,32 @@
 from redislite import Redis
-import os, datetime
+import os, datetime, threading
 from api.utils import helpers as h
+from api.monitoring.timing import span
 
 
 class RedisClient:
-    # REDIS_DB_PATH = os.environ.get("REDIS_DB_PATH", os.path.join("/tmp/estokealo.db")
-    REDIS_DB_PATH = os.path.join("/tmp/estokealo.db")
+    REDIS_DB_PATH = os.environ.get("REDIS_DB_PATH", os.path.join("/tmp/estokealo.db"))
+    _connection = None  # shared by all the threads/greenlets of a worker
+    _connection_pid = None
+    _lock = threading.Lock()
 
     def __init__(self) -> None:
         pass
 
     def set_connection(self):
-        return Redis(self.REDIS_DB_PATH)
+        """
+        process wide client, created on first use and again after fork.
+        a client per call would open a new connection pool (and may start/stop
+        the embedded redis server) on every request.
+        """
+        cls = type(self)
+        if cls._connection is None or cls._connection_pid != os.getpid():
+            with cls._lock:
+                if cls._connection is None or cls._connection_pid != os.getpid():
+                    cls._connection = Redis(self.REDIS_DB_PATH)
+                    cls._connection_pid = os.getpid()
+
+        return cls._connection
 
     def add_jwt_to_blocklist(self, claims) -> tuple[bool, str]:
         """
@@ -27,6 +42,7 @@ class RedisClient:
             return True, "jwt is already expired"
 
         expires = jwt_exp - now_date
-        rdb.set(jti, "", ex=expires)
+        with span("redis"):
+            rdb.set(jti, "", ex=expires)
 
         return True, "jwt has been blocked"
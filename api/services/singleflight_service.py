@@ -0,0 +1,75 @@
+import json, threading
+from flask import Response, current_app, make_response, request
+from api.services.cache_service import LocalLRU
+from api.utils.helpers import QueryParams
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    coalesces identical concurrent reads inside a worker: the first request with a key
+    runs the view, requests arriving while it runs wait and get a copy of its response.
+    with a microcache ttl (max 5 seconds) 200 responses are also reused for that long after.
+    only the body, status and content type are shared, every request builds its own
+    Response, so the after_request hooks (request id, cors) still run per request.
+    """
+
+    SHARED_HEADER = "X-Coalesced"
+    calls = {}  # key: _Call in flight
+    lock = threading.Lock()
+    microcache = LocalLRU(maxsize=512, ttl=5.0)
+
+    @staticmethod
+    def key_for(*scope) -> str:
+        query = json.dumps(QueryParams(request.args).normalize_query(), sort_keys=True)
+        return json.dumps([request.endpoint, *scope, query])
+
+    @classmethod
+    def do(cls, key: str, fn, microcache: float = 0):
+        if microcache:
+            found, record = cls.microcache.get(key)
+            if found:
+                return cls._response(record, shared="cache")
+
+        with cls.lock:
+            call = cls.calls.get(key)
+            leader = call is None
+            if leader:
+                call = cls.calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(current_app.config.get("SINGLEFLIGHT_TIMEOUT", 10)):
+                return fn()  # leader is too slow, don't queue behind it
+            if call.error is not None:
+                raise call.error
+            return cls._response(call.result, shared="flight")
+
+        try:
+            response = make_response(fn())
+            call.result = {
+                "body": response.get_data(),
+                "status": response.status_code,
+                "mimetype": response.mimetype,
+            }
+            if microcache and response.status_code == 200:
+                cls.microcache.set(key, call.result, ttl=microcache)
+            return response
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with cls.lock:
+                cls.calls.pop(key, None)
+            call.done.set()
+
+    @classmethod
+    def _response(cls, record: dict, shared: str) -> Response:
+        response = Response(record["body"], status=record["status"], mimetype=record["mimetype"])
+        response.headers[cls.SHARED_HEADER] = shared
+        return response
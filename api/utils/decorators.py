@@ -1,14 +1,45 @@
-import functools
-from flask import request, abort
+import functools, hmac
+from flask import request, abort, current_app, make_response, g
+from redis.exceptions import RedisError
 from api.utils.exceptions import APIException
 from api.models.main import User, Role
 from flask_jwt_extended import verify_jwt_in_request, get_jwt
 from api.extensions import db
 from api.utils.responses import JSONResponse
+from api.monitoring.timing import span
+from api.services.idempotency_service import IdempotencyStore
+from api.services.singleflight_service import SingleFlight
 from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 
 
+def _verify_jwt() -> dict:
+    """
+    verifies the jwt of the request and returns its claims.
+    sub-requests of /batch share the app context (g) and the Authorization header of the
+    batch request, so the token is decoded and checked against the blocklist only once.
+    """
+    claims = g.get("batch_claims")
+    if claims is not None:
+        return claims
+
+    verify_jwt_in_request()
+    return get_jwt()
+
+
+def _load_identity(model, pk: int):
+    """user/role of the jwt, looked up once per batch request (g.batch_identities)"""
+    identities = g.get("batch_identities")
+    if identities is None:
+        return db.session.get(model, pk)
+
+    key = (model.__name__, pk)
+    if key not in identities:
+        identities[key] = db.session.get(model, pk)
+
+    return identities[key]
+
+
 # decorator to be called every time an endpoint is reached
 def json_required(schema: dict = None):
     def decorator(func):
@@ -26,7 +57,8 @@ def json_required(schema: dict = None):
                 if not _json:
                     raise APIException.from_response(JSONResponse.bad_request())
                 try:
-                    validate(instance=_json, schema=schema)
+                    with span("validation"):
+                        validate(instance=_json, schema=schema)
                 except ValidationError as e:
                     message = " ".join(e.absolute_path) + ", " + e.message
                     raise APIException.from_response(
@@ -46,15 +78,14 @@ def role_required(level: int = 99):  # role-level required for the target endpoi
     def wrapper(fn):
         @functools.wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
+            claims = _verify_jwt()
 
             if claims.get("role_access_token", None):
                 role_id = claims.get("role_id", None)
                 if not role_id:
                     abort(500, "role_id not present in jwt")
 
-                role = db.session.query(Role).get(role_id)
+                role = _load_identity(Role, role_id)
                 if role is None:
                     raise APIException.from_response(
                         JSONResponse.permanently_deleted(
@@ -94,15 +125,14 @@ def user_required():
     def wrapper(fn):
         @functools.wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
+            claims = _verify_jwt()
 
             if claims.get("user_access_token", False):
                 user_id = claims.get("user_id", None)
                 if not user_id:
                     abort(500, "user_id not present in jwt")
 
-                user = db.session.query(User).get(user_id)
+                user = _load_identity(User, user_id)
                 if not user:
                     raise APIException.from_response(
                         JSONResponse.permanently_deleted(
@@ -135,8 +165,7 @@ def verification_token_required():
     def wrapper(fn):
         @functools.wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
+            claims = _verify_jwt()
             if claims.get("verification_token", False):
                 kwargs["claims"] = claims  # !
                 return fn(*args, **kwargs)
@@ -157,8 +186,7 @@ def verified_token_required():
     def wrapper(fn):
         @functools.wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
+            claims = _verify_jwt()
             if claims.get("verified_token", False):
                 kwargs["claims"] = claims  # !
                 return fn(*args, **kwargs)
@@ -172,3 +200,112 @@ def verified_token_required():
         return decorator
 
     return wrapper
+
+
+# decorator to grant access to internal/admin endpoints.
+def admin_token_required():
+    def wrapper(fn):
+        @functools.wraps(fn)
+        def decorator(*args, **kwargs):
+            token = current_app.config.get("ADMIN_TOKEN")
+            received = request.headers.get("X-Admin-Token", "")
+            if not received and request.authorization is not None:
+                received = request.authorization.token or ""  # prometheus bearer_token
+            if not token or not hmac.compare_digest(received, token):
+                raise APIException.from_response(JSONResponse.unauthorized())
+
+            return fn(*args, **kwargs)
+
+        return decorator
+
+    return wrapper
+
+
+# decorator to make retries of a mutating endpoint safe, with the Idempotency-Key header.
+# must be the first decorator after route(): a retried signup carries an already blocklisted jwt.
+def idempotent():
+    def wrapper(fn):
+        @functools.wraps(fn)
+        def decorator(*args, **kwargs):
+            idempotency_key = request.headers.get(IdempotencyStore.HEADER)
+            if idempotency_key is None:
+                return fn(*args, **kwargs)
+
+            if not 0 < len(idempotency_key) <= 255:
+                return JSONResponse(
+                    **JSONResponse.bad_request(), data={"idempotency_key": "must have 1 to 255 characters"}
+                ).to_json()
+
+            store = IdempotencyStore()
+            if not store.enabled:
+                return fn(*args, **kwargs)
+
+            key = store.key_for(idempotency_key)
+            fingerprint = store.fingerprint()
+            try:
+                while not store.acquire(key, fingerprint):
+                    record = store.wait_for(key)
+                    if record is None:  # first request failed and released the key
+                        continue
+                    if record["fingerprint"] != fingerprint:
+                        return JSONResponse(
+                            **JSONResponse.unprocessable_entity(),
+                            data={"idempotency_key": "already used with a different request body"},
+                        ).to_json()
+                    if record["status"] == "in_flight":
+                        return JSONResponse(
+                            **JSONResponse.conflict(),
+                            data={"idempotency_key": "a request with this key is still in progress"},
+                        ).to_json()
+                    return store.replay(record)
+            except RedisError:
+                return fn(*args, **kwargs)  # without the store, requests run as if there was no key
+
+            try:
+                response = make_response(fn(*args, **kwargs))
+            except APIException as e:
+                response = make_response(e.to_json())
+            except Exception:
+                store.release(key)
+                raise
+
+            try:
+                if response.status_code >= 500:
+                    store.release(key)
+                else:
+                    store.save(key, fingerprint, response)
+            except RedisError:
+                store.release(key)
+
+            return response
+
+        return decorator
+
+    return wrapper
+
+
+# decorator to share one computation between identical concurrent GET requests in a worker.
+# key: endpoint, company (role) or user, normalized query params. must be inside role/user_required.
+def coalesce(microcache: float = None):
+    def wrapper(fn):
+        @functools.wraps(fn)
+        def decorator(*args, **kwargs):
+            config = current_app.config
+            if not config.get("SINGLEFLIGHT_ENABLED", True) or request.method != "GET":
+                return fn(*args, **kwargs)
+
+            if "role" in kwargs:
+                scope = ("company", kwargs["role"].company_id)
+            elif "user" in kwargs:
+                scope = ("user", kwargs["user"].id)
+            else:
+                scope = ()
+
+            ttl = config.get("MICROCACHE_TTL", 0) if microcache is None else microcache
+            return SingleFlight.do(
+                SingleFlight.key_for(*scope), lambda: fn(*args, **kwargs), microcache=ttl
+            )
+
+        return decorator
+
+    return wrapper
@@ -35,6 +35,7 @@ class OperationStatus(BaseEnum):
     ACCEPTED = "accepted"
     PENDING = "pending"
     REJECTED = "rejected"
+    EXPIRED = "expired"
 
 
 if __name__ == "__main__":
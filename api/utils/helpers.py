@@ -1,8 +1,6 @@
 from typing import Union
 from datetime import datetime, timezone
 import os, re, string, unicodedata
-from dateutil.parser import parse, ParserError
-from itsdangerous import BadSignature, Signer
 from random import sample
 from flask_jwt_extended import create_access_token
 
@@ -23,6 +21,8 @@ def normalize_datetime(date: str) -> Union[datetime, None]:
     Helper function to normalize datetime and store it into the database
     The normalized datetime is naive, and utc based
     """
+    from dateutil.parser import parse, ParserError  # deferred, slow import only needed here
+
     try:
         dt = parse(date)
         if dt.tzinfo is not None:
@@ -46,6 +46,8 @@ def convert_utc_epoch_to_datetime(epoch_utc: float) -> datetime:
 
 def create_qr_encoded_sign(payload: str) -> str:
     """sign a string using itsdangerous Signer class"""
+    from itsdangerous import Signer
+
     SECRET = os.environ["QR_SIGNER_SECRET"]
     QR_PREFIX = os.environ["QR_PREFIX"]
     signer = Signer(secret_key=SECRET)
@@ -61,6 +63,7 @@ def read_qr_encoded_sign(qrcode: str) -> Union[str, None]:
     returns the raw data inside the signed string.
     if the decode process fails, returns None
     """
+    from itsdangerous import BadSignature, Signer
 
     SECRET = os.environ["QR_SIGNER_SECRET"]
     QR_PREFIX = os.environ["QR_PREFIX"]
@@ -1,5 +1,6 @@
 from flask import jsonify, Response
 from typing import TypedDict, Any
+from api.monitoring.timing import span
 
 
 class ResponseParams(TypedDict, total=False):
@@ -43,7 +44,8 @@ class JSONResponse:
         return rv
 
     def to_json(self) -> tuple[Response, int]:
-        return jsonify(self.serialize()), self.status_code
+        with span("serialize"):
+            return jsonify(self.serialize()), self.status_code
 
     @staticmethod
     def bad_request() -> ResponseParams:
@@ -110,6 +112,14 @@ class JSONResponse:
             "status_code": 410,
         }
 
+    @staticmethod
+    def unprocessable_entity() -> ResponseParams:
+        """status_code: 422"""
+        return {
+            "message": "request can't be processed with the given parameters",
+            "status_code": 422,
+        }
+
     @staticmethod
     def service_unavailable() -> ResponseParams:
         """status_code: 503"""
@@ -0,0 +1,112 @@
+"""
+CPU cost vs bytes saved for the compression middleware.
+
+usage:
+    python -m benchmarks.compression [--rounds 20]
+
+payloads:
+- SPA bundle and stylesheet from frontend_app/build
+- a JSON list similar to /company/users (20 items per page) and a 200 items page.
+"""
+import argparse, json, os, time
+from middlewares.compression import StreamCompressor, brotli
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR = os.path.join(BASE_DIR, "frontend_app", "build", "static")
+
+
+def _company_users_payload(items: int) -> bytes:
+    users = [
+        {
+            "id": i,
+            "first_name": f"usuario{i}",
+            "last_name": "apellido",
+            "email": f"usuario{i}@estokealo.com",
+            "signup_completed": True,
+            "role": {
+                "id": i,
+                "relation_date": "2023-07-29T21:52:21Z",
+                "is_active": True,
+                "invitation_status": "accepted",
+                "access_level": 2,
+            },
+        }
+        for i in range(items)
+    ]
+    body = {
+        "message": "success",
+        "payload": {
+            "users": users,
+            "pagination": {"totalPages": 5, "hasNextPage": True, "hasPrevPage": False,
+                           "currentPage": 1, "totalItems": items * 5},
+        },
+    }
+    return json.dumps(body, indent=2).encode("utf-8")  # flask pretty-prints in debug mode
+
+
+def _read_build_file(*parts) -> bytes:
+    with open(os.path.join(BUILD_DIR, *parts), "rb") as f:
+        return f.read()
+
+
+def load_payloads() -> dict[str, bytes]:
+    return {
+        "main.js": _read_build_file("js", "main.7b61e890.js"),
+        "main.css": _read_build_file("css", "main.073c9b0a.css"),
+        "company_users_20.json": _company_users_payload(20),
+        "company_users_200.json": _company_users_payload(200),
+    }
+
+
+def measure(payload: bytes, encoding: str, level: int, rounds: int, chunk_size: int = 8192) -> dict:
+    out_size = 0
+    start = time.process_time()
+    for _ in range(rounds):
+        compressor = StreamCompressor(encoding, level)
+        out_size = 0
+        for i in range(0, len(payload), chunk_size):
+            out_size += len(compressor.compress(payload[i:i + chunk_size]))
+        out_size += len(compressor.flush())
+    cpu_ms = (time.process_time() - start) * 1000 / rounds
+
+    saved = len(payload) - out_size
+    return {
+        "encoding": f"{encoding}-{level}",
+        "original_bytes": len(payload),
+        "compressed_bytes": out_size,
+        "ratio": round(out_size / len(payload), 3),
+        "cpu_ms": round(cpu_ms, 3),
+        "kb_saved_per_cpu_ms": round(saved / 1024 / cpu_ms, 1) if cpu_ms else None,
+    }
+
+
+def run(rounds: int) -> list[dict]:
+    settings = [("gzip", 1), ("gzip", 6), ("gzip", 9)]
+    if brotli is not None:
+        settings += [("br", 1), ("br", 4), ("br", 11)]
+
+    results = []
+    for name, payload in load_payloads().items():
+        for encoding, level in settings:
+            r = measure(payload, encoding, level, rounds if level < 11 else max(1, rounds // 10))
+            results.append({"payload": name, **r})
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    args = parser.parse_args()
+
+    results = run(args.rounds)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'payload':<24}{'encoding':<10}{'bytes':>10}{'compressed':>12}{'ratio':>8}{'cpu ms':>10}{'KB/ms':>8}")
+        for r in results:
+            print(
+                f"{r['payload']:<24}{r['encoding']:<10}{r['original_bytes']:>10}"
+                f"{r['compressed_bytes']:>12}{r['ratio']:>8}{r['cpu_ms']:>10}{r['kb_saved_per_cpu_ms']:>8}"
+            )
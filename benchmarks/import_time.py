@@ -0,0 +1,119 @@
+"""
+import-time profile of the dispatcher and the sub apps (python -X importtime), with budgets.
+
+usage:
+    python -m benchmarks.import_time                 # all targets, fails when a budget is exceeded
+    python -m benchmarks.import_time -t api --top 30
+    python -m benchmarks.import_time --json
+
+targets:
+- dispatcher: `import dispatcher`, sub apps are lazy so this is the cold start cost.
+- landing, frontend, api: building each sub app (first request cost).
+- preload: DISPATCHER_PRELOAD=1, all apps built at import (gunicorn --preload).
+
+each target runs in a fresh interpreter, best of --runs. modules imported by the bare
+interpreter are not counted. budgets are in milliseconds.
+"""
+import argparse, json, os, subprocess, sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "dispatcher": ("import dispatcher", 100),
+    "landing": ("import dispatcher; dispatcher.landing.load()", 300),
+    "frontend": ("import dispatcher; dispatcher.frontend.load()", 200),
+    "api": ("import dispatcher; dispatcher.backend.load()", 1200),
+    "preload": ("import os; os.environ['DISPATCHER_PRELOAD'] = '1'; import dispatcher", 1200),
+}
+
+# settings needed to build the apps, real values are not used
+APP_ENV = {
+    "API_SETTINGS": "api.config.DevelopmentConfig",
+    "FRONTEND_SETTINGS": "frontend_app.config.DevelopmentConfig",
+    "LANDINGPAGE_SETTINGS": "landingpage_app.config.DevelopmentConfig",
+    "SECRET_KEY": "import-time",
+    "JWT_SECRET_KEY": "import-time",
+    "MAIN_DATABASE_URL": "sqlite:////tmp/estokealo-import-time.db",  # never connected
+    "SMTP_API_URL": "",
+    "SMTP_API_KEY": "",
+    "EMAIL_SERVICE_MODE": "development",
+}
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """rows of the -X importtime report: {"module", "self_us", "cumulative_us", "depth"}"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append(
+            {
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+            }
+        )
+
+    return rows
+
+
+def profile(code: str) -> list[dict]:
+    env = {**os.environ, **{k: v for k, v in APP_ENV.items() if k not in os.environ}}
+    env["PYTHONPATH"] = BASE_DIR
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", code],
+        env=env, cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.splitlines()[-1] if result.stderr else "import failed")
+
+    return parse_importtime(result.stderr)
+
+
+def report(name: str, runs: int, top: int, startup: set) -> dict:
+    """'startup' modules are imported by the bare interpreter (site, .pth files) and not counted"""
+    code, budget_ms = TARGETS[name]
+    best = None
+    for _ in range(runs):
+        rows = [r for r in profile(code) if r["module"] not in startup]
+        total = sum(r["self_us"] for r in rows)
+        if best is None or total < best[0]:
+            best = (total, rows)
+
+    total, rows = best
+    min_depth = min((r["depth"] for r in rows), default=0)
+    top_level = [r for r in rows if r["depth"] == min_depth]  # modules imported directly by the target
+    heaviest = sorted(top_level, key=lambda r: r["cumulative_us"], reverse=True)[:top]
+    total_ms = round(total / 1000, 1)
+    return {
+        "target": name,
+        "total_ms": total_ms,
+        "budget_ms": budget_ms,
+        "over_budget": total_ms > budget_ms,
+        "modules": len(rows),
+        "top": [{"module": r["module"], "cumulative_ms": round(r["cumulative_us"] / 1000, 1)} for r in heaviest],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-t", "--target", action="append", choices=list(TARGETS), help="default: all")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="heaviest top level imports to show")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    startup = {r["module"] for r in profile("pass")}
+    reports = [report(name, args.runs, args.top, startup) for name in args.target or TARGETS]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for r in reports:
+            flag = "  OVER BUDGET" if r["over_budget"] else ""
+            print(f"{r['target']}: {r['total_ms']} ms (budget {r['budget_ms']} ms, {r['modules']} modules){flag}")
+            for item in r["top"]:
+                print(f"    {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+
+    sys.exit(1 if any(r["over_budget"] for r in reports) else 0)
@@ -0,0 +1,257 @@
+"""
+microbenchmarks for helpers, validators and model serializers, with stored baselines.
+
+usage:
+    python -m benchmarks.micro                  # compare with the baseline, exit 1 on regressions
+    python -m benchmarks.micro --save           # store the current numbers as the new baseline
+    python -m benchmarks.micro -k email --json  # only benchmarks with 'email' in the name
+
+timings are stored relative to a pure python calibration loop measured in the same run,
+so a baseline recorded on one machine stays usable on another one.
+a benchmark regresses when its relative time is more than --tolerance over the baseline,
+after --retries new measurements (per benchmark tolerances can be set in the baseline file).
+"""
+import argparse, json, os, sys, timeit
+from datetime import datetime
+from werkzeug.datastructures import MultiDict
+
+os.environ.setdefault("SMTP_API_URL", "")  # read by the email service at import time, not used here
+os.environ.setdefault("SMTP_API_KEY", "")
+os.environ.setdefault("EMAIL_SERVICE_MODE", "development")
+
+from api.utils import helpers as h
+from api.models.main import Company, Role, User
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "micro.json")
+BENCHMARKS = {}  # name: setup function, returns the callable to time
+
+
+def benchmark(name: str):
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def _user(i: int = 1) -> User:
+    return User(
+        id=i,
+        _email=f"usuario{i}@estokealo.com",
+        _signup_completed=True,
+        _signup_date=datetime(2023, 7, 29, 21, 52, 21),
+        _profile_image="",
+        first_name=f"usuario{i}",
+        last_name="apellido",
+        phone="+58 412 0000000",
+        address={"address": {"street": "calle 1", "number": "2", "city": "caracas", "country": "ve"}},
+    )
+
+
+def _company(i: int = 1) -> Company:
+    return Company(
+        id=i,
+        _created_at=datetime(2023, 7, 29, 21, 52, 21),
+        _logo="",
+        name=f"empresa {i}",
+        tz_name="america/caracas",
+        address={"address": {}},
+        currency_data={"currency_data": Company.BASE_CURRENCY},
+    )
+
+
+def _role(i: int = 1) -> Role:
+    return Role(
+        id=i,
+        _relation_date=datetime(2023, 7, 29, 21, 52, 21),
+        _inv_status="accepted",
+        _is_active=True,
+        access_level=2,
+        user=_user(i),
+        company=_company(i),
+    )
+
+
+@benchmark("calibration")
+def _calibration():
+    def fn():
+        total = 0
+        for i in range(100):
+            total += i * i
+        return total
+
+    return fn
+
+
+@benchmark("helpers.is_valid_email_format")
+def _email_format():
+    return lambda: h.is_valid_email_format("usuario.prueba@estokealo.com")
+
+
+@benchmark("helpers.is_valid_email_format.invalid")
+def _email_format_invalid():
+    return lambda: h.is_valid_email_format("usuario.prueba@@estokealo")
+
+
+@benchmark("helpers.is_valid_password_format")
+def _password_format():
+    return lambda: h.is_valid_password_format("Estokealo12345")
+
+
+@benchmark("helpers.normalize_datetime")
+def _normalize_datetime():
+    return lambda: h.normalize_datetime("2023-07-29T21:52:21-04:00")
+
+
+@benchmark("helpers.datetime_formatter")
+def _datetime_formatter():
+    date = datetime(2023, 7, 29, 21, 52, 21)
+    return lambda: h.datetime_formatter(date)
+
+
+@benchmark("helpers.normalize_string")
+def _normalize_string():
+    return lambda: h.normalize_string("  Usuario.Prueba@Estokealo.com ")
+
+
+@benchmark("helpers.remove_accents")
+def _remove_accents():
+    return lambda: h.remove_accents("compañía de inversiones árbol")
+
+
+@benchmark("QueryParams.pagination")
+def _query_params_pagination():
+    args = MultiDict([("page", "2"), ("limit", "20"), ("status", "accepted")])
+
+    def fn():
+        qp = h.QueryParams(args)
+        qp.get_first_value("status")
+        return qp.get_pagination_params()
+
+    return fn
+
+
+@benchmark("QueryParams.normalize_query")
+def _query_params_normalize():
+    args = MultiDict([("page", "2"), ("limit", "20"), ("status", "accepted"), ("id", "1"), ("id", "2")])
+    return lambda: h.QueryParams(args).normalize_query()
+
+
+@benchmark("User.serialize_all")
+def _user_serialize_all():
+    user = _user()
+    return user.serialize_all
+
+
+@benchmark("Role.serialize_with_user")
+def _role_serialize_with_user():
+    role = _role()
+    return role.serialize_with_user
+
+
+@benchmark("Company.serialize_all")
+def _company_serialize_all():
+    company = _company()
+    return company.serialize_all
+
+
+@benchmark("company_users.page_20")
+def _company_users_page():
+    roles = [_role(i) for i in range(20)]
+    return lambda: [{**r.user.serialize(), "role": r.serialize()} for r in roles]
+
+
+def measure(fn, repeat: int = 5) -> float:
+    """best time of one call, in nanoseconds"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def run(names: list, repeat: int) -> dict:
+    calibrate = BENCHMARKS["calibration"]()
+    timings = {}
+    calibration = measure(calibrate, repeat)
+    for name in names:
+        timings[name] = measure(BENCHMARKS[name](), repeat)
+        calibration = min(calibration, measure(calibrate, repeat))  # interleaved, cpu frequency drifts
+
+    results = {
+        name: {"ns": round(ns, 1), "relative": round(ns / calibration, 4)}
+        for name, ns in timings.items()
+    }
+
+    return {"calibration_ns": round(calibration, 1), "benchmarks": results}
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[dict]:
+    rows = []
+    for name, item in current["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        row = {"name": name, "ns": item["ns"], "change": None, "regression": False}
+        if base is not None:
+            row["change"] = round(item["relative"] / base["relative"] - 1, 3)
+            row["regression"] = row["change"] > baseline.get("tolerances", {}).get(name, tolerance)
+        rows.append(row)
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="keyword", default="", help="only benchmarks with this in the name")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--retries", type=int, default=2, help="new measurements of regressed benchmarks")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    names = [n for n in BENCHMARKS if n != "calibration" and args.keyword in n]
+    current = run(names, args.repeat)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.setdefault("tolerances", {})
+        baseline["calibration_ns"] = current["calibration_ns"]
+        baseline.setdefault("benchmarks", {}).update(current["benchmarks"])
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run with --save first")
+        sys.exit(2)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    rows = compare(current, baseline, args.tolerance)
+    for _ in range(args.retries):
+        regressed = [row["name"] for row in rows if row["regression"]]
+        if not regressed:
+            break
+        # noisy machines: measure the regressed benchmarks again and keep the best result
+        again = run(regressed, args.repeat)["benchmarks"]
+        for name, item in again.items():
+            if item["relative"] < current["benchmarks"][name]["relative"]:
+                current["benchmarks"][name] = item
+        rows = compare(current, baseline, args.tolerance)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'benchmark':<40} {'ns/op':>12} {'change':>9}")
+        for row in rows:
+            change = "new" if row["change"] is None else f"{row['change'] * 100:+.1f}%"
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['name']:<40} {row['ns']:>12.1f} {change:>9}{flag}")
+
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
@@ -0,0 +1,60 @@
+"""
+local stand-ins for the external services used by the API:
+- FakeSMTPServer: accepts the SMTP API requests of Email_api_service, with optional latency.
+- redis: the API already uses redislite, an embedded redis server; benchmarks point
+  REDIS_DB_PATH to a temporary file so runs don't share the development store.
+"""
+import json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSMTPServer:
+    """threaded http server that answers 201 to every POST, after 'latency' seconds"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.received = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                if server.latency:
+                    time.sleep(server.latency)
+                server.received += 1
+                body = json.dumps({"messageId": f"<bench-{server.received}@localhost>"}).encode()
+                self.send_response(201)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v3/smtp/email"
+
+    def start(self) -> "FakeSMTPServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    smtp = FakeSMTPServer(port=8025).start()
+    print(f"fake smtp api listening at {smtp.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        smtp.stop()
@@ -1,15 +1,39 @@
+import os
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
-from werkzeug.serving import run_simple
-from frontend_app import create_app as create_frontend
-from landingpage_app import create_app as create_landing
-from api import create_app as create_api
+from middlewares.compression import CompressionMiddleware
+from middlewares.lazy import LazyApp
 
-application = DispatcherMiddleware(create_landing(), {
-    '/app': create_frontend(),
-    '/api': create_api()
-})
+# sub apps are built on their first request, DISPATCHER_PRELOAD=1 builds them at import
+# (gunicorn --preload, so the workers fork with the apps already built)
+landing = LazyApp("landingpage_app:create_app")
+frontend = LazyApp("frontend_app:create_app")
+backend = LazyApp("api:create_app")
+
+application = CompressionMiddleware(DispatcherMiddleware(landing, {
+    '/app': frontend,
+    '/api': backend
+}))
+
+
+def preload() -> None:
+    for app in (landing, frontend, backend):
+        app.load()
+
+
+def post_fork() -> None:
+    """called in every gunicorn worker (gunicorn.conf.py), apps built before fork keep the master state"""
+    if backend.loaded:
+        from api import reinit_after_fork
+
+        reinit_after_fork(backend.load())
+
+
+if os.environ.get("DISPATCHER_PRELOAD") == "1":
+    preload()
 
 if __name__ == '__main__':
+    from werkzeug.serving import run_simple
+
     run_simple(
         hostname='localhost',
         port=5000,
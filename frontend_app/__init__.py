@@ -1,17 +1,28 @@
 import os
-from flask import Flask, send_from_directory
+from flask import Flask, abort
+from middlewares.static_files import StaticIndex, send_static_file
 
 def create_app(test_config=None):
     app = Flask(__name__, static_folder="build")
     if test_config is None:
         app.config.from_object(os.environ["FRONTEND_SETTINGS"])
 
+    static_index = StaticIndex(app.static_folder, url_prefix="/app/")
+
     @app.route("/", defaults={"path": ""})
     @app.route("/<path:path>")
     def catch_all(path):
-        if path != "" and os.path.exists(app.static_folder + '/' + path):
-            return send_from_directory(app.static_folder, path)
+        static_file = static_index.get(path) or static_index.get("index.html")
+        if static_file is None:
+            abort(404)
+
+        if static_file.immutable:
+            max_age = app.config["IMMUTABLE_MAX_AGE"]
+        elif static_file.rel_path == "index.html":  # spa routes, always revalidated
+            max_age = 0
         else:
-            return send_from_directory(app.static_folder, 'index.html')
+            max_age = app.config["STATIC_MAX_AGE"]
+
+        return send_static_file(static_file, max_age=max_age)
 
     return app
\ No newline at end of file
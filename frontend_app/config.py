@@ -6,6 +6,10 @@ class Config(object):
     DEVELOPMENT=False
     DEBUG=False
     TESTING=False
+    IMMUTABLE_MAX_AGE=31536000  # hashed build files
+    STATIC_MAX_AGE=3600  # not hashed files (favicon, manifest.json, logos)
+    USE_X_SENDFILE=os.environ.get("STATIC_SENDFILE") == "1"  # front proxy sends the files (X-Sendfile)
+    STATIC_ACCEL_REDIRECT=os.environ.get("FRONTEND_ACCEL_REDIRECT", "")  # nginx internal location of the directory
 
 
 class ProductionConfig(Config):
@@ -0,0 +1,69 @@
+"""
+gunicorn settings for wsgi:application, read from the environment:
+
+- PORT (8000), WEB_CONCURRENCY: workers (2 * cpus + 1).
+- GUNICORN_WORKER_CLASS: sync | gthread | gevent (gthread). gevent is the async mode.
+  sync: one request at a time per worker, the baseline.
+  gthread: GUNICORN_THREADS threads per worker, for the I/O bound endpoints (db, redis, smtp api).
+  gevent: GUNICORN_WORKER_CONNECTIONS greenlets per worker, needs `gevent` installed
+  (and `psycogreen` for cooperative postgres calls).
+- GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER: graceful worker recycling.
+- GUNICORN_PRELOAD=1: apps are built in the master before fork (faster worker start,
+  shared memory); every worker resets its db pool, log thread and caches in post_fork.
+
+the worker models are compared in benchmarks/workers.py.
+"""
+import glob, multiprocessing, os, sys
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class == "gevent":
+    # async mode: sockets, ssl, threads and sleeps become cooperative, so a worker serves
+    # GUNICORN_WORKER_CONNECTIONS requests waiting on the smtp api, redis or postgres at once
+    # with the same sync views.
+    from gevent import monkey
+
+    monkey.patch_all()  # before the app is imported, also with preload
+    try:
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+    except ImportError:
+        sys.stderr.write("psycogreen is not installed, postgres queries block the gevent worker\n")
+
+    # every greenlet waiting on the db holds a connection
+    os.environ.setdefault("DB_POOL_SIZE", "20")
+    os.environ.setdefault("DB_POOL_MAX_OVERFLOW", "20")
+    os.environ.setdefault("EMAIL_POOL_SIZE", "100")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4)) if worker_class == "gthread" else 1
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))  # workers don't restart together
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+if preload_app:
+    os.environ["DISPATCHER_PRELOAD"] = "1"
+
+accesslog = None  # request logs are written by the api log pipeline
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """snapshots of a previous run would be merged as dead workers in /metrics"""
+    multiproc_dir = os.environ.get("METRICS_MULTIPROC_DIR")
+    if multiproc_dir and os.path.isdir(multiproc_dir):
+        for path in glob.glob(os.path.join(multiproc_dir, "metrics_*.json*")):
+            os.remove(path)
+
+
+def post_fork(server, worker):
+    import dispatcher
+
+    dispatcher.post_fork()
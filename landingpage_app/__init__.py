@@ -1,5 +1,6 @@
-import os
-from flask import Flask, render_template
+import hashlib, os
+from flask import Flask, make_response, render_template, request, send_from_directory
+from middlewares.static_files import StaticIndex, send_static_file
 from .extensions import assets
 
 
@@ -10,8 +11,40 @@ def create_app(test_config=None):
 
     assets.init_app(app)
 
+    pages = {}  # template: (body, etag)
+
+    def cached_page(template: str):
+        """
+        rendered page with ETag. with PAGE_CACHE the page is rendered once per worker,
+        bundle urls only change on deploy.
+        """
+        page = pages.get(template)
+        if page is None:
+            body = render_template(template)
+            page = (body, hashlib.sha1(body.encode("utf-8")).hexdigest())
+            if app.config["PAGE_CACHE"]:
+                pages[template] = page
+
+        response = make_response(page[0])
+        response.set_etag(page[1])
+        response.cache_control.public = True
+        response.cache_control.max_age = app.config["PAGE_MAX_AGE"]
+        return response.make_conditional(request)
+
     @app.route("/")
     def index():
-        return render_template("index.html")
+        return cached_page("index.html")
+
+    static_index = StaticIndex(app.static_folder)
+
+    def static(filename):
+        """flask static view, with precompressed variants and cache headers"""
+        static_file = static_index.get(filename)
+        if static_file is None:  # bundles built by flask-assets after startup
+            return send_from_directory(app.static_folder, filename, max_age=0)
+
+        max_age = app.config["IMMUTABLE_MAX_AGE"] if static_file.immutable else app.config["STATIC_MAX_AGE"]
+        return send_static_file(static_file, max_age=max_age)
 
+    app.view_functions["static"] = static
     return app
\ No newline at end of file
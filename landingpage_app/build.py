@@ -0,0 +1,35 @@
+"""
+ahead of time compilation of the landing bundles, run it in the deploy build:
+    python -m landingpage_app.build
+- scss is compiled with libsass style 'compressed', js is minified with jsmin.
+- bundles are written as static/bundle/main.<hash>.(css|js), versions go to the
+  assets manifest, which the app reads when ASSETS_AUTO_BUILD is off (production).
+- .br/.gz variants of the bundles are written next to them.
+"""
+import os
+from landingpage_app import create_app
+from landingpage_app.extensions import assets
+from landingpage_app.utils.assets import bundles, libsass
+from middlewares.precompress import precompress_directory
+
+
+def build() -> list[str]:
+    os.environ.setdefault("LANDINGPAGE_SETTINGS", "landingpage_app.config.ProductionConfig")
+    app = create_app()
+    libsass.style = "compressed"
+
+    outputs = []
+    with app.app_context():
+        for name in bundles:
+            bundle = assets[name]
+            bundle.build(force=True)
+            outputs += bundle.urls()
+
+        outputs += precompress_directory(os.path.join(app.static_folder, "bundle"))
+
+    return outputs
+
+
+if __name__ == "__main__":
+    for output in build():
+        print(output)
@@ -6,10 +6,20 @@ class Config(object):
     DEVELOPMENT=False
     DEBUG=False
     TESTING=False
+    IMMUTABLE_MAX_AGE=31536000  # versioned bundles
+    STATIC_MAX_AGE=3600
+    USE_X_SENDFILE=os.environ.get("STATIC_SENDFILE") == "1"  # front proxy sends the files (X-Sendfile)
+    STATIC_ACCEL_REDIRECT=os.environ.get("LANDING_ACCEL_REDIRECT", "")  # nginx internal location of the directory
+    ASSETS_VERSIONS="hash"
+    ASSETS_MANIFEST="json:bundle/manifest.json"  # bundle versions, written by `python -m landingpage_app.build`
+    ASSETS_AUTO_BUILD=True
+    PAGE_CACHE=False  # rendered pages kept in memory, revalidated with their ETag
+    PAGE_MAX_AGE=60
 
 
 class ProductionConfig(Config):
-    pass
+    ASSETS_AUTO_BUILD=False  # bundles are compiled at build time
+    PAGE_CACHE=True
 
 
 class StagingConfig(Config):
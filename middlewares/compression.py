@@ -0,0 +1,205 @@
+import zlib
+
+try:  # brotli is optional, gzip is always available
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+DEFAULT_MIMETYPES = (
+    "application/json",
+    "application/javascript",
+    "application/manifest+json",
+    "image/svg+xml",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+)
+
+# Content-Types that are already compressed and never pass through the encoders.
+SKIP_MIMETYPES = ("image/png", "image/jpeg", "image/gif", "image/webp", "image/x-icon", "font/woff2")
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """
+    returns a dict {coding: q-value} from an Accept-Encoding header.
+    codings with q=0 are included, so the caller can reject them.
+    """
+    codings = {}
+    for item in (header or "").split(","):
+        parts = item.strip().split(";")
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+
+    return codings
+
+
+def choose_encoding(header: str, available: tuple = ("br", "gzip")) -> str | None:
+    """returns the best coding in 'available' accepted by the client, or None"""
+    codings = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = codings.get(coding, codings.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+
+    return best
+
+
+class StreamCompressor:
+    """
+    incremental compressor, with the same interface for gzip and brotli.
+    - compress(chunk) -> bytes
+    - flush() -> bytes (finishes the stream)
+    """
+
+    def __init__(self, encoding: str, level: int = None) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._obj = brotli.Compressor(quality=level if level is not None else 4)
+            self._compress = self._obj.process
+            self._finish = self._obj.finish
+        else:
+            self._obj = zlib.compressobj(level if level is not None else 6, zlib.DEFLATED, 31)
+            self._compress = self._obj.compress
+            self._finish = self._obj.flush
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compress(chunk)
+
+    def flush(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """
+    WSGI middleware that compresses responses with brotli or gzip.
+
+    Responses are skipped when:
+    - the client does not accept any supported coding.
+    - Content-Type is not in the allowlist (images, fonts, etc.)
+    - Content-Encoding is already set (precompressed files).
+    - Content-Length is known and smaller than 'min_size'.
+    - the status code has no body (204, 304) or is a partial response (206).
+
+    The body is compressed chunk by chunk, so streamed responses are not buffered.
+    """
+
+    def __init__(
+        self,
+        app,
+        min_size: int = 500,
+        mimetypes: tuple = DEFAULT_MIMETYPES,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.min_size = min_size
+        self.mimetypes = mimetypes
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+        self.available = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") == "HEAD":
+            return self.app(environ, start_response)
+
+        encoding = choose_encoding(environ.get("HTTP_ACCEPT_ENCODING", ""), self.available)
+        if encoding is None:
+            return self.app(environ, start_response)
+
+        state = {}
+
+        def _start_response(status, headers, exc_info=None):
+            if self._should_compress(status, headers):
+                headers = self._update_headers(headers, encoding)
+                state["compressor"] = StreamCompressor(encoding, self.levels[encoding])
+            else:
+                headers = self._add_vary(headers)
+
+            return start_response(status, headers, exc_info)
+
+        app_iter = self.app(environ, _start_response)
+        return self._iter_body(app_iter, state)
+
+    def _should_compress(self, status: str, headers: list) -> bool:
+        code = int(status.split(" ", 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+
+        content_type, content_length = "", None
+        for key, value in headers:
+            key = key.lower()
+            if key == "content-encoding":
+                return False
+            if key == "content-type":
+                content_type = value.split(";", 1)[0].strip().lower()
+            elif key == "content-length":
+                content_length = int(value)
+            elif key == "cache-control" and "no-transform" in value.lower():
+                return False
+
+        if content_type in SKIP_MIMETYPES or content_type not in self.mimetypes:
+            return False
+
+        if content_length is not None and content_length < self.min_size:
+            return False
+
+        return True
+
+    @staticmethod
+    def _add_vary(headers: list) -> list:
+        for i, (key, value) in enumerate(headers):
+            if key.lower() == "vary":
+                if "accept-encoding" not in value.lower():
+                    headers[i] = (key, f"{value}, Accept-Encoding")
+                return headers
+
+        return headers + [("Vary", "Accept-Encoding")]
+
+    def _update_headers(self, headers: list, encoding: str) -> list:
+        new_headers = []
+        for key, value in headers:
+            lower_key = key.lower()
+            if lower_key in ("content-length", "accept-ranges"):
+                continue  # length is unknown until the stream is finished, ranges are not supported
+            if lower_key == "etag":
+                # weak etag, compressed representation is not byte-equal to the original
+                value = value if value.startswith("W/") else f"W/{value}"
+            new_headers.append((key, value))
+
+        new_headers.append(("Content-Encoding", encoding))
+        return self._add_vary(new_headers)
+
+    @staticmethod
+    def _iter_body(app_iter, state: dict):
+        try:
+            for chunk in app_iter:
+                compressor = state.get("compressor")
+                if compressor is None:
+                    yield chunk
+                    continue
+
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+
+            compressor = state.get("compressor")
+            if compressor is not None:
+                yield compressor.flush()
+        finally:
+            if hasattr(app_iter, "close"):
+                app_iter.close()
@@ -0,0 +1,35 @@
+import importlib, threading
+
+
+class LazyApp:
+    """
+    WSGI app built on its first request.
+    'factory' is an import path "module:function"; the module is not imported
+    until the app is needed, so mounting an app costs nothing at startup.
+    call load() to build it ahead of time (preload before the workers fork).
+    """
+
+    def __init__(self, factory: str) -> None:
+        self.factory = factory
+        self._app = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"LazyApp(factory={self.factory!r}, loaded={self.loaded})"
+
+    @property
+    def loaded(self) -> bool:
+        return self._app is not None
+
+    def load(self):
+        if self._app is None:
+            with self._lock:
+                if self._app is None:  # another thread may have built it while waiting
+                    module_name, _, function_name = self.factory.partition(":")
+                    module = importlib.import_module(module_name)
+                    self._app = getattr(module, function_name or "create_app")()
+
+        return self._app
+
+    def __call__(self, environ, start_response):
+        return self.load()(environ, start_response)
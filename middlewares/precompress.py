@@ -0,0 +1,85 @@
+"""
+build step: writes .br and .gz siblings of the static bundles, served by middlewares.static_files.
+
+usage:
+    python -m middlewares.precompress [directories...]
+default directories: frontend_app/build and landingpage_app/static/bundle.
+"""
+import gzip, os, sys
+from middlewares.compression import brotli
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIRECTORIES = (
+    os.path.join(BASE_DIR, "frontend_app", "build"),
+    os.path.join(BASE_DIR, "landingpage_app", "static", "bundle"),
+)
+EXTENSIONS = (".js", ".css", ".html", ".svg", ".json", ".txt", ".ico", ".map")
+ENCODING_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+MIN_SIZE = 1024
+MIN_SAVING = 0.1  # variants that don't save at least 10% are not written
+
+
+def variants(path: str) -> dict[str, str]:
+    """{encoding: path} of the precompressed siblings of 'path' that are up to date"""
+    rv = {}
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return rv
+
+    for encoding, extension in ENCODING_EXTENSIONS.items():
+        variant = path + extension
+        if os.path.exists(variant) and os.path.getmtime(variant) >= mtime:
+            rv[encoding] = variant
+
+    return rv
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)  # mtime=0, same bytes on every build
+
+
+def precompress_file(path: str) -> list[str]:
+    """writes the missing or outdated variants of 'path', returns the written paths"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    written = []
+    existing = variants(path)
+    for encoding, extension in ENCODING_EXTENSIONS.items():
+        if encoding in existing or (encoding == "br" and brotli is None):
+            continue
+
+        compressed = _compress(data, encoding)
+        if len(compressed) > len(data) * (1 - MIN_SAVING):
+            continue
+
+        tmp_path = f"{path}{extension}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, path + extension)
+        written.append(path + extension)
+
+    return written
+
+
+def precompress_directory(root: str) -> list[str]:
+    written = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if filename.endswith(EXTENSIONS) and os.path.getsize(path) >= MIN_SIZE:
+                written += precompress_file(path)
+
+    return written
+
+
+if __name__ == "__main__":
+    if brotli is None:
+        print("brotli is not installed, only .gz files are written")
+
+    for directory in sys.argv[1:] or DEFAULT_DIRECTORIES:
+        for path in precompress_directory(directory):
+            print(f"{os.path.relpath(path, BASE_DIR)} ({os.path.getsize(path)} bytes)")
@@ -0,0 +1,103 @@
+import hashlib, json, mimetypes, os, re
+from flask import current_app, request, send_file
+from middlewares.compression import choose_encoding
+from middlewares.precompress import ENCODING_EXTENSIONS, variants
+
+# content hash in the file name, e.g. main.7b61e890.js, logo.6ce24c58023cc2f8fd88fe9d219db6c6.svg
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.")
+
+
+class StaticFile:
+    def __init__(self, root: str, rel_path: str, immutable: bool) -> None:
+        self.rel_path = rel_path
+        self.path = os.path.join(root, rel_path)
+        self.immutable = immutable
+        self.mimetype = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+        self.variants = variants(self.path)  # precompressed siblings, {encoding: path}
+        with open(self.path, "rb") as f:
+            self.etag = hashlib.sha1(f.read()).hexdigest()  # same value on every instance of a deploy
+
+    def __repr__(self) -> str:
+        return f"StaticFile(rel_path={self.rel_path!r}, immutable={self.immutable})"
+
+
+class StaticIndex:
+    """
+    in-memory index of a static directory, built once at startup:
+    {relative path: StaticFile}. files listed in the asset-manifest.json of the directory
+    or with a content hash in their name are immutable, everything else must be revalidated.
+    .br/.gz siblings are served as variants of their file, not as files.
+    a new build needs a restart (deploys restart the workers anyway).
+    """
+
+    MANIFEST = "asset-manifest.json"
+
+    def __init__(self, root: str, url_prefix: str = "/") -> None:
+        self.root = root
+        self.files = {}
+        hashed = self._manifest_files(url_prefix)
+
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                base, extension = os.path.splitext(path)
+                if extension in ENCODING_EXTENSIONS.values() and os.path.exists(base):
+                    continue
+
+                rel_path = os.path.relpath(path, root).replace(os.sep, "/")
+                immutable = rel_path in hashed or bool(HASHED_NAME.search(filename))
+                self.files[rel_path] = StaticFile(root, rel_path, immutable and rel_path != "index.html")
+
+    def _manifest_files(self, url_prefix: str) -> set:
+        try:
+            with open(os.path.join(self.root, self.MANIFEST)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return set()
+
+        return {
+            url[len(url_prefix):] if url.startswith(url_prefix) else url.lstrip("/")
+            for url in manifest.get("files", {}).values()
+        }
+
+    def get(self, path: str) -> StaticFile | None:
+        return self.files.get(path)
+
+
+def send_static_file(static_file: StaticFile, max_age: int = 0):
+    """
+    sends 'static_file', or its precompressed variant accepted by the client.
+    - immutable files: Cache-Control public, max-age, immutable.
+    - max_age=0: no-cache, revalidated with the ETag.
+    app config:
+    - USE_X_SENDFILE: flask sets X-Sendfile, the front proxy (apache, lighttpd) sends the bytes.
+    - STATIC_ACCEL_REDIRECT: internal nginx location of the directory, e.g. "/_static/app/";
+      the response carries X-Accel-Redirect and no body.
+    """
+    encoding = choose_encoding(request.headers.get("Accept-Encoding", ""), tuple(static_file.variants))
+    path = static_file.variants.get(encoding, static_file.path)
+    etag = f"{static_file.etag}-{encoding}" if encoding else static_file.etag
+
+    accel_prefix = current_app.config.get("STATIC_ACCEL_REDIRECT")
+    if accel_prefix:
+        response = current_app.response_class(mimetype=static_file.mimetype)
+        extension = ENCODING_EXTENSIONS[encoding] if encoding else ""
+        response.headers["X-Accel-Redirect"] = f"{accel_prefix}{static_file.rel_path}{extension}"
+        response.set_etag(etag)
+        response.cache_control.public = bool(max_age)
+        response.cache_control.max_age = max_age
+        response.make_conditional(request)
+    else:
+        response = send_file(path, mimetype=static_file.mimetype, etag=etag, max_age=max_age)
+
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if static_file.variants:
+        response.vary.add("Accept-Encoding")
+
+    if static_file.immutable and max_age:
+        response.cache_control.immutable = True
+    elif not max_age:
+        response.cache_control.no_cache = True
+
+    return response
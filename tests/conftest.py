@@ -0,0 +1,120 @@
+import os, tempfile
+
+# the config classes and RedisClient read the environment at import time
+_tmp = tempfile.mkdtemp(prefix="estokealo-tests-")
+os.environ.setdefault("API_SETTINGS", "api.config.TestingConfig")
+os.environ.setdefault("FRONTEND_SETTINGS", "frontend_app.config.TestingConfig")
+os.environ.setdefault("LANDINGPAGE_SETTINGS", "landingpage_app.config.TestingConfig")
+os.environ.setdefault("SECRET_KEY", "test-secret-with-at-least-32-bytes")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-with-at-least-32-bytes")
+os.environ.setdefault("SMTP_API_URL", "http://localhost")
+os.environ.setdefault("SMTP_API_KEY", "test")
+os.environ.setdefault("EMAIL_SERVICE_MODE", "development")
+os.environ["MAIN_DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["REDIS_DB_PATH"] = os.path.join(_tmp, "redis.db")
+
+import pytest
+from flask_jwt_extended import create_access_token
+from werkzeug.test import Client
+from api import create_app
+from api.extensions import db
+from api.models.main import Company, Role, User
+from api.services.redis_service import RedisClient
+from api.utils import helpers as h
+from api.utils.enums import AccessLevel, OperationStatus
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    yield app
+    app.extensions["log_pipeline"].stop()
+
+
+@pytest.fixture(autouse=True)
+def clean_state(app):
+    """empty tables and redis db for every test"""
+    with app.app_context():
+        db.create_all()
+    RedisClient().set_connection().flushdb()
+    yield
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def dispatcher_client():
+    """client of the whole wsgi stack (compression, dispatcher, sub apps)"""
+    from dispatcher import application
+
+    return Client(application)
+
+
+@pytest.fixture
+def rdb():
+    return RedisClient().set_connection()
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(email: str, signup_completed: bool = True) -> int:
+        with app.app_context():
+            user = User(email=email, password="Password123", signup_completed=signup_completed)
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+
+    return make_user
+
+
+@pytest.fixture
+def make_company(app):
+    def make_company(name: str) -> int:
+        with app.app_context():
+            company = Company(name=name)
+            db.session.add(company)
+            db.session.commit()
+            return company.id
+
+    return make_company
+
+
+@pytest.fixture
+def make_role(app):
+    def make_role(
+        user_id: int,
+        company_id: int,
+        access_level: int = AccessLevel.OWNER.value,
+        status: str = OperationStatus.ACCEPTED.value,
+    ) -> int:
+        with app.app_context():
+            role = Role(user_id=user_id, company_id=company_id, access_level=access_level, _inv_status=status)
+            db.session.add(role)
+            db.session.commit()
+            return role.id
+
+    return make_role
+
+
+@pytest.fixture
+def auth_header(app):
+    """Authorization headers for user, role and verified (signup) tokens"""
+
+    def auth_header(user_id: int = None, role_id: int = None, email: str = None, verified: bool = False) -> dict:
+        with app.test_request_context():
+            if verified:
+                token = create_access_token(identity=email, additional_claims={"verified_token": True})
+            elif role_id is not None:
+                token = h.create_role_access_token(jwt_id=email or "", role_id=role_id, user_id=user_id)
+            else:
+                token = h.create_user_access_token(jwt_id=email or "", user_id=user_id)
+
+        return {"Authorization": f"Bearer {token}"}
+
+    return auth_header
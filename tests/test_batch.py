@@ -0,0 +1,80 @@
+import time
+
+
+def _responses(response) -> dict:
+    assert response.status_code == 200
+    return {item["id"]: item for item in response.json["payload"]["responses"]}
+
+
+def test_batch_runs_sub_requests_in_order(client, make_user, auth_header):
+    user_id = make_user("ana@example.com")
+    response = client.post(
+        "/batch",
+        json={"requests": [{"id": "user", "path": "/user/"}, {"id": "companies", "path": "/user/companies"}]},
+        headers=auth_header(user_id=user_id),
+    )
+
+    items = response.json["payload"]["responses"]
+    assert [item["id"] for item in items] == ["user", "companies"]
+    assert [item["status"] for item in items] == [200, 200]
+    assert items[0]["body"]["payload"]["user"]["email"] == "ana@example.com"
+
+
+def test_batch_without_jwt_runs_public_requests(client, make_user):
+    make_user("ana@example.com")
+    response = client.post(
+        "/batch",
+        json={"requests": [
+            {"id": "public", "path": "/auth/user-public-info?email=ana@example.com"},
+            {"id": "private", "path": "/user/"},
+        ]},
+    )
+
+    items = _responses(response)
+    assert items["public"]["status"] == 200
+    assert items["private"]["status"] == 401
+
+
+def test_batch_rejects_streaming_endpoints(client, make_user, auth_header):
+    user_id = make_user("ana@example.com")
+    start = time.monotonic()
+    response = client.post(
+        "/batch",
+        json={"requests": [{"id": "events", "path": "/user/events"}]},
+        headers=auth_header(user_id=user_id),
+    )
+
+    assert time.monotonic() - start < 5
+    assert _responses(response)["events"]["status"] == 400
+
+
+def test_batch_only_runs_gets(client, make_user, auth_header):
+    user_id = make_user("ana@example.com")
+    response = client.post(
+        "/batch",
+        json={"requests": [{"id": "batch", "path": "/batch"}, {"id": "signup", "path": "/auth/signup"}]},
+        headers=auth_header(user_id=user_id),
+    )
+
+    items = _responses(response)
+    assert items["batch"]["status"] == 405
+    assert items["signup"]["status"] == 405
+
+
+def test_batch_max_requests(app, client):
+    items = [{"path": "/user/"}] * (app.config["BATCH_MAX_REQUESTS"] + 1)
+    response = client.post("/batch", json={"requests": items})
+
+    assert response.status_code == 400
+
+
+def test_batch_time_limit(app, client, make_user, auth_header, monkeypatch):
+    user_id = make_user("ana@example.com")
+    monkeypatch.setitem(app.config, "BATCH_TIMEOUT", -1)
+    response = client.post(
+        "/batch",
+        json={"requests": [{"id": "user", "path": "/user/"}]},
+        headers=auth_header(user_id=user_id),
+    )
+
+    assert _responses(response)["user"]["status"] == 504
@@ -0,0 +1,74 @@
+import gzip
+import pytest
+from middlewares.compression import brotli, choose_encoding
+
+ASSET = "/app/static/js/main.7b61e890.js"  # 140 KB, no precompressed variants in the repo build
+SMALL = "/app/robots.txt"  # below min_size
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br, gzip;q=0.5", "br"),
+    ("*", "br"),
+    ("gzip;q=0, identity", None),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, ("br", "gzip")) == expected
+
+
+def test_gzip_response(dispatcher_client):
+    plain = dispatcher_client.get(ASSET)
+    response = dispatcher_client.get(ASSET, headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+def test_brotli_is_preferred(dispatcher_client):
+    plain = dispatcher_client.get(ASSET)
+    response = dispatcher_client.get(ASSET, headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data()) == plain.get_data()
+
+
+@pytest.mark.skipif(brotli is not None, reason="brotli is installed")
+def test_brotli_only_client_without_brotli(dispatcher_client):
+    response = dispatcher_client.get(ASSET, headers={"Accept-Encoding": "br"})
+
+    assert "Content-Encoding" not in response.headers
+
+
+def test_vary_is_added(dispatcher_client):
+    compressed = dispatcher_client.get(ASSET, headers={"Accept-Encoding": "gzip"})
+    plain = dispatcher_client.get(SMALL, headers={"Accept-Encoding": "gzip"})
+
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+
+def test_etag_is_weakened(dispatcher_client):
+    plain = dispatcher_client.get(ASSET)
+    compressed = dispatcher_client.get(ASSET, headers={"Accept-Encoding": "gzip"})
+
+    assert not plain.headers["ETag"].startswith("W/")
+    assert compressed.headers["ETag"] == f"W/{plain.headers['ETag']}"
+
+
+def test_small_body_is_not_compressed(dispatcher_client):
+    plain = dispatcher_client.get(SMALL)
+    response = dispatcher_client.get(SMALL, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data() == plain.get_data()
+
+
+def test_head_is_not_compressed(dispatcher_client):
+    response = dispatcher_client.head(ASSET, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert int(response.headers["Content-Length"]) == len(dispatcher_client.get(ASSET).get_data())
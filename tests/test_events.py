@@ -0,0 +1,65 @@
+import json
+import pytest
+from api.services.events_service import EventBus, sse_stream
+
+
+@pytest.fixture
+def stream(app, client, make_user, make_company, make_role, auth_header, monkeypatch):
+    """open /company/events stream of an admin, yields (company_id, chunk iterator, response)"""
+    monkeypatch.setitem(app.config, "SSE_HEARTBEAT", 0.1)
+    monkeypatch.setitem(app.config, "SSE_MAX_DURATION", 5)
+    owner_id, company_id = make_user("owner@example.com"), make_company("acme")
+    role_id = make_role(owner_id, company_id)
+
+    response = client.get("/company/events", headers=auth_header(user_id=owner_id, role_id=role_id), buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    chunks = (c.decode() if isinstance(c, bytes) else c for c in response.response)
+    assert next(chunks) == f"retry: {app.config['SSE_RETRY_MS']}\n\n"  # subscribed from here
+    yield company_id, chunks, response
+    response.close()
+
+
+def _next_event(chunks) -> str:
+    for chunk in chunks:
+        if not chunk.startswith(":"):
+            return chunk
+    raise AssertionError("stream ended")
+
+
+def test_published_event_is_framed(stream):
+    company_id, chunks, _ = stream
+    EventBus.publish("role_updated", {"role_id": 7, "status": "accepted"}, user_id=1, company_id=company_id)
+
+    assert _next_event(chunks) == 'event: role_updated\ndata: {"role_id": 7, "status": "accepted"}\n\n'
+
+
+def test_other_company_events_are_not_sent(stream):
+    company_id, chunks, _ = stream
+    EventBus.publish("role_updated", {"role_id": 8}, company_id=company_id + 1)
+    EventBus.publish("role_deleted", {"role_id": 9}, company_id=company_id)
+
+    assert json.loads(_next_event(chunks).split("data: ", 1)[1]) == {"role_id": 9}
+
+
+def test_keepalive_without_events(stream):
+    _, chunks, _ = stream
+
+    assert next(chunks) == ": keepalive\n\n"
+
+
+def test_disconnect_closes_the_subscription(stream, rdb):
+    company_id, _, response = stream
+    channel = EventBus.company_channel(company_id)
+    assert dict(rdb.pubsub_numsub(channel))[channel.encode()] == 1
+
+    response.close()  # client went away
+
+    assert dict(rdb.pubsub_numsub(channel))[channel.encode()] == 0
+
+
+def test_stream_ends_after_max_duration(app):
+    chunks = list(sse_stream([EventBus.company_channel(1)], heartbeat=0.05, max_duration=0.2, retry_ms=100))
+
+    assert chunks[0] == "retry: 100\n\n"
+    assert set(chunks[1:]) == {": keepalive\n\n"}
@@ -0,0 +1,50 @@
+from api.extensions import db
+from api.models.main import User
+
+SIGNUP = {"password": "Password123*", "re_password": "Password123*", "first_name": "ana", "last_name": "lopez"}
+
+
+def _signup(client, headers, key, body=SIGNUP):
+    return client.post("/auth/signup", json=body, headers={**headers, "Idempotency-Key": key})
+
+
+def test_duplicate_request_is_replayed(app, client, auth_header):
+    headers = auth_header(email="ana@example.com", verified=True)
+
+    first = _signup(client, headers, "signup-1")
+    second = _signup(client, headers, "signup-1")  # the verified token is blocked after the first signup
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_data() == first.get_data()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    with app.app_context():
+        assert db.session.query(User).count() == 1
+
+
+def test_key_reused_with_another_body(client, auth_header):
+    headers = auth_header(email="ana@example.com", verified=True)
+    _signup(client, headers, "signup-1")
+
+    response = _signup(client, headers, "signup-1", body={**SIGNUP, "first_name": "eva"})
+
+    assert response.status_code == 422
+
+
+def test_key_is_scoped_by_authorization(client, auth_header):
+    _signup(client, auth_header(email="ana@example.com", verified=True), "signup-1")
+
+    response = _signup(client, auth_header(email="eva@example.com", verified=True), "signup-1")
+
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+    assert response.json["payload"]["user"]["email"] == "eva@example.com"
+
+
+def test_requests_without_key_are_not_replayed(client, auth_header):
+    headers = auth_header(email="ana@example.com", verified=True)
+    client.post("/auth/signup", json=SIGNUP, headers=headers)
+
+    response = client.post("/auth/signup", json=SIGNUP, headers=headers)
+
+    assert response.status_code != 201
@@ -0,0 +1,133 @@
+import json, threading, time
+from datetime import datetime, timedelta
+from api.extensions import db
+from api.jobs import tasks
+from api.models.main import Role
+from api.services.events_service import EventBus
+from api.utils.enums import AccessLevel, OperationStatus
+from api.jobs.queue import (
+    FAILED_KEY, SCHEDULED_KEY, JobQueue, Worker, heartbeat_key, processing_key, queue_key, task,
+)
+
+calls = []
+
+
+@task(name="tests.record", queue="tests")
+def record(value):
+    calls.append(value)
+
+
+@task(name="tests.fail", queue="tests", retries=2, backoff=10)
+def fail():
+    raise RuntimeError("boom")
+
+
+@task(name="tests.slow", queue="tests")
+def slow(seconds):
+    time.sleep(seconds)
+    calls.append("slow")
+
+
+def _worker(app) -> Worker:
+    return Worker(app, ["tests"], poll_timeout=1)
+
+
+def test_job_runs_in_worker(app, rdb):
+    calls.clear()
+    record.delay(1)
+
+    assert _worker(app).work_once() is True
+    assert calls == [1]
+    assert rdb.llen(queue_key("tests")) == 0
+
+
+def test_failed_job_is_retried_with_backoff(app, rdb):
+    fail.delay()
+    worker = _worker(app)
+
+    before = time.time()
+    worker.work_once()
+    [(raw, run_at)] = rdb.zrange(SCHEDULED_KEY, 0, -1, withscores=True)
+    job = json.loads(raw)
+    assert job["attempts"] == 1
+    assert "boom" in job["error"]
+    assert before + 10 <= run_at <= time.time() + 10
+
+    rdb.zadd(SCHEDULED_KEY, {raw: 0})  # due now
+    assert worker.queue.promote_scheduled() == 1
+    worker.work_once()
+    [(raw, run_at)] = rdb.zrange(SCHEDULED_KEY, 0, -1, withscores=True)
+    assert json.loads(raw)["attempts"] == 2
+    assert run_at >= time.time() + 19  # backoff * 2 ** (attempts - 1)
+
+
+def test_job_out_of_retries_goes_to_failed(app, rdb):
+    fail.delay()
+    worker = _worker(app)
+    for _ in range(3):
+        for raw in rdb.zrange(SCHEDULED_KEY, 0, -1):
+            rdb.zadd(SCHEDULED_KEY, {raw: 0})
+        worker.queue.promote_scheduled()
+        worker.work_once()
+
+    assert rdb.zcard(SCHEDULED_KEY) == 0
+    assert [job["attempts"] for job in worker.queue.failed()] == [3]
+
+    assert worker.queue.retry_failed() == 1
+    assert rdb.llen(FAILED_KEY) == 0
+    assert json.loads(rdb.lindex(queue_key("tests"), 0))["attempts"] == 0
+
+
+def test_orphans_of_dead_workers_are_requeued(rdb):
+    dead = json.dumps({"id": "a", "task": "tests.record", "queue": "tests", "args": [1], "kwargs": {}, "attempts": 0})
+    alive = json.dumps({"id": "b", "task": "tests.record", "queue": "tests", "args": [2], "kwargs": {}, "attempts": 0})
+    rdb.lpush(processing_key("host:1"), dead)
+    rdb.lpush(processing_key("host:2"), alive)
+    rdb.set(heartbeat_key("host:2"), "", ex=30)
+
+    assert JobQueue().requeue_orphans() == 1
+    assert rdb.lrange(queue_key("tests"), 0, -1) == [dead.encode()]
+    assert rdb.lrange(processing_key("host:2"), 0, -1) == [alive.encode()]
+
+
+def test_long_job_keeps_its_heartbeat(app, rdb, monkeypatch):
+    calls.clear()
+    monkeypatch.setattr(Worker, "HEARTBEAT_TTL", 1)
+    slow.delay(2.5)
+    worker = _worker(app)
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    try:
+        time.sleep(1.8)  # the job is running and the first heartbeat would have expired
+        assert rdb.exists(heartbeat_key(worker.worker_id))
+        assert JobQueue().requeue_orphans() == 0
+    finally:
+        worker.stop()
+        thread.join()
+
+    assert calls == ["slow"]
+    assert rdb.llen(queue_key("tests")) == 0
+    assert not rdb.exists(heartbeat_key(worker.worker_id))
+
+
+def test_expired_invitations_are_published(app, rdb, make_user, make_company, make_role):
+    user_id, company_id = make_user("ana@example.com"), make_company("acme")
+    role_id = make_role(user_id, company_id, AccessLevel.OPERATOR.value, OperationStatus.PENDING.value)
+    with app.app_context():
+        db.session.get(Role, role_id)._relation_date = datetime.utcnow() - timedelta(days=30)
+        db.session.commit()
+    pubsub = rdb.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(EventBus.user_channel(user_id), EventBus.company_channel(company_id))
+
+    with app.app_context():
+        assert tasks.expire_invitations() == 1
+        assert db.session.get(Role, role_id).inv_status == OperationStatus.EXPIRED.value
+
+    messages, deadline = [], time.monotonic() + 2
+    while len(messages) < 2 and time.monotonic() < deadline:
+        message = pubsub.get_message(timeout=0.1)  # None for the subscribe confirmations
+        if message is not None:
+            messages.append(message)
+    pubsub.close()
+    assert [json.loads(m["data"])["event"] for m in messages] == ["invitation_expired"] * 2
+    assert json.loads(messages[0]["data"])["data"]["role_id"] == role_id
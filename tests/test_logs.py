@@ -0,0 +1,78 @@
+import logging
+from flask import Flask
+from api.monitoring import logs
+from api.monitoring.logs import LogPipeline
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.records = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _app_with_pipeline(name: str):
+    app = Flask(name)
+    app.config["LOG_JSON"] = True
+
+    @app.route("/")
+    def index():
+        logging.getLogger(f"{name}.views").info("listed %s", "items", extra={"data": {"rows": 3}})
+        return "ok"
+
+    pipeline = LogPipeline(app)
+    handler = CaptureHandler()
+    pipeline.start(handler)  # records go through the queue to this handler
+    return app, pipeline, handler
+
+
+def test_records_reach_the_handler_with_the_request_id():
+    app, pipeline, handler = _app_with_pipeline("logtest")
+
+    response = app.test_client().get("/", headers={"X-Request-ID": "req-123"})
+    pipeline.stop()  # flushes the queue
+
+    assert response.headers["X-Request-ID"] == "req-123"
+    [record] = handler.records
+    assert record.getMessage() == "listed items"
+    assert record.request_id == "req-123"
+    assert record.data == {"rows": 3}
+
+
+def test_request_id_is_generated():
+    app, pipeline, handler = _app_with_pipeline("logtest_generated")
+
+    response = app.test_client().get("/")
+    pipeline.stop()
+
+    assert len(response.headers["X-Request-ID"]) == 32
+    assert handler.records[0].request_id == response.headers["X-Request-ID"]
+
+
+def test_traceback_is_kept_for_the_formatter():
+    app, pipeline, handler = _app_with_pipeline("logtest_exc")
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logging.getLogger("logtest_exc").exception("failed")
+    pipeline.stop()
+
+    [record] = handler.records
+    assert record.getMessage() == "failed"
+    assert "ZeroDivisionError" in record.exc_text
+    assert "ZeroDivisionError" in logs.JSONFormatter().format(record)
+
+
+def test_stop_is_registered_once(monkeypatch):
+    registered = []
+    monkeypatch.setattr(logs.atexit, "register", registered.append)
+    app, pipeline, _ = _app_with_pipeline("logtest_atexit")
+
+    for _ in range(2):
+        pipeline.listener.stop()  # the thread is gone in a forked worker
+        pipeline.restart()
+    pipeline.stop()
+
+    assert registered == [pipeline.stop]
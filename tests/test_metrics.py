@@ -0,0 +1,78 @@
+import json, re, subprocess, sys
+from api.extensions import db
+from api.monitoring.metrics import DB_POOL_EVENTS, MetricsRegistry
+
+
+def _sample(text: str, line_prefix: str) -> float:
+    match = re.search(rf"^{re.escape(line_prefix)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{line_prefix} not in metrics"
+    return float(match.group(1))
+
+
+def test_pool_events_are_counters(app, client, make_user):
+    metrics = app.extensions["metrics"]
+    with app.app_context():
+        first = metrics.render()
+    make_user("ana@example.com")  # more checkouts
+    with app.app_context():
+        second = metrics.render()
+
+    assert "# TYPE api_db_pool_events_total counter" in second
+    before = _sample(first, 'api_db_pool_events_total{event="checkouts"}')
+    after = _sample(second, 'api_db_pool_events_total{event="checkouts"}')
+    assert after > before
+    with app.app_context():
+        assert after == db.engine.pool.stats.checkouts  # the difference is added, not the total again
+    assert DB_POOL_EVENTS.kind == "counter"
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_multiprocess_merge(tmp_path):
+    def worker_registry():
+        registry = MetricsRegistry()
+        return (
+            registry,
+            registry.counter("jobs_total", "jobs", ("queue",)),
+            registry.gauge("in_flight", "requests being served"),
+            registry.histogram("latency_seconds", "latency", buckets=(0.1, 1.0)),
+        )
+
+    dead, counter, gauge, histogram = worker_registry()
+    counter.inc(2, queue="default")
+    gauge.set(5)
+    histogram.observe(0.05)
+    histogram.observe(3)
+    (tmp_path / f"metrics_{_dead_pid()}.json").write_text(json.dumps(dead.snapshot()))
+
+    live, counter, gauge, histogram = worker_registry()
+    counter.inc(1, queue="default")
+    counter.inc(1, queue="mail")
+    gauge.set(1)
+    histogram.observe(0.5)
+
+    text = live.render(str(tmp_path))  # dumps the live worker snapshot and merges both
+
+    assert "# TYPE jobs_total counter" in text
+    assert _sample(text, 'jobs_total{queue="default"}') == 3
+    assert _sample(text, 'jobs_total{queue="mail"}') == 1
+    assert _sample(text, "in_flight") == 1  # gauge of the dead worker is dropped
+    assert _sample(text, 'latency_seconds_bucket{le="0.1"}') == 1
+    assert _sample(text, 'latency_seconds_bucket{le="1.0"}') == 2  # cumulative
+    assert _sample(text, 'latency_seconds_bucket{le="+Inf"}') == 3
+    assert _sample(text, "latency_seconds_count") == 3
+    assert _sample(text, "latency_seconds_sum") == 3.55
+    assert text.endswith("\n")
+
+
+def test_merge_skips_unreadable_snapshots(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "jobs").inc()
+    (tmp_path / "metrics_notapid.json").write_text("{}")
+    (tmp_path / "metrics_123.json.tmp").write_text("{")
+
+    assert _sample(registry.render(str(tmp_path)), "jobs_total") == 1
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import text
+from api.extensions import db
+from api.models.main import Company, Role, User
+from api.services.cache_service import PublicInfoCache
+from api.utils.enums import AccessLevel, OperationStatus
+
+EMAIL = "ana@example.com"
+
+
+@pytest.fixture(autouse=True)
+def cache_enabled(app, monkeypatch):
+    monkeypatch.setitem(app.config, "PUBLIC_INFO_CACHE_ENABLED", True)
+    PublicInfoCache.local.clear()
+    yield
+    PublicInfoCache.local.clear()
+
+
+def _public_info(client, email=EMAIL):
+    return client.get(f"/auth/user-public-info?email={email}", json={})
+
+
+def _company_names(response) -> list[str]:
+    assert response.status_code == 200
+    return [c["name"] for c in response.json["payload"]["user_public"]["companies"]]
+
+
+def test_company_change_invalidates_members(app, client, make_user, make_company, make_role):
+    company_id = make_company("acme")
+    make_role(make_user(EMAIL), company_id)
+    assert _company_names(_public_info(client)) == ["acme"]
+
+    with app.app_context():  # writes that skip the orm hooks keep the cached value
+        db.session.execute(text("UPDATE company SET name = 'stale' WHERE id = :id"), {"id": company_id})
+        db.session.commit()
+    assert _company_names(_public_info(client)) == ["acme"]
+
+    with app.app_context():
+        db.session.get(Company, company_id).name = "globex"
+        db.session.commit()
+    assert _company_names(_public_info(client)) == ["globex"]
+
+
+def test_role_change_invalidates_user(app, client, make_user, make_company, make_role):
+    user_id = make_user(EMAIL)
+    make_role(user_id, make_company("acme"))
+    assert _company_names(_public_info(client)) == ["acme"]
+
+    with app.app_context():
+        db.session.add(Role(
+            user_id=user_id, company=Company(name="globex"),
+            access_level=AccessLevel.OPERATOR.value, _inv_status=OperationStatus.ACCEPTED.value,
+        ))
+        db.session.commit()
+    assert sorted(_company_names(_public_info(client))) == ["acme", "globex"]
+
+
+def test_rollback_keeps_the_cached_value(app, client, make_user, make_company, make_role):
+    company_id = make_company("acme")
+    make_role(make_user(EMAIL), company_id)
+    _public_info(client)
+
+    with app.app_context():
+        db.session.get(Company, company_id).name = "globex"
+        db.session.flush()
+        db.session.rollback()
+        assert db.session.info.get(PublicInfoCache.SESSION_KEY) is None
+
+    found, value = PublicInfoCache.local.get(PublicInfoCache._key(EMAIL))
+    assert found and value["companies"][0]["name"] == "acme"
+
+
+def test_negative_result_is_invalidated_by_signup(app, client):
+    assert _public_info(client).status_code == 404
+    found, value = PublicInfoCache.local.get(PublicInfoCache._key(EMAIL))
+    assert found and value is None
+
+    with app.app_context():
+        db.session.add(User(email=EMAIL, password="Password123", signup_completed=True))
+        db.session.commit()
+
+    assert _company_names(_public_info(client)) == []
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import event
+from api.extensions import db
+from api.models.main import Company, Role, User
+from api.monitoring.queries import QueryBudgetExceeded
+from api.utils.enums import AccessLevel, OperationStatus
+
+
+@pytest.fixture
+def statements(app):
+    """statements executed by the db engine while the test runs"""
+    executed = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "after_cursor_execute", on_execute)
+    yield executed
+    event.remove(engine, "after_cursor_execute", on_execute)
+
+
+def _add_members(app, company_id: int, count: int) -> None:
+    with app.app_context():
+        users = [User(email=f"member{i}@example.com", password="Password123", signup_completed=True) for i in range(count)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add_all([
+            Role(user_id=user.id, company_id=company_id, access_level=AccessLevel.OPERATOR.value,
+                 _inv_status=OperationStatus.ACCEPTED.value)
+            for user in users
+        ])
+        db.session.commit()
+
+
+def _add_companies(app, user_id: int, count: int) -> None:
+    with app.app_context():
+        companies = [Company(name=f"company {i}") for i in range(count)]
+        db.session.add_all(companies)
+        db.session.flush()
+        db.session.add_all([
+            Role(user_id=user_id, company_id=company.id, access_level=AccessLevel.OPERATOR.value,
+                 _inv_status=OperationStatus.PENDING.value)
+            for company in companies
+        ])
+        db.session.commit()
+
+
+def test_budget_exceeded_raises_in_testing(app, client, make_user, auth_header, monkeypatch):
+    assert app.config["QUERY_BUDGET_RAISE"]
+    user_id = make_user("ana@example.com")
+    monkeypatch.setitem(app.config, "QUERY_BUDGET", 0)  # GET /user/ has no own budget
+
+    with pytest.raises(QueryBudgetExceeded, match="budget is 0"):
+        client.get("/user/", headers=auth_header(user_id=user_id), json={})
+
+
+def test_budget_is_only_logged_without_raise(app, client, make_user, auth_header, monkeypatch):
+    user_id = make_user("ana@example.com")
+    monkeypatch.setitem(app.config, "QUERY_BUDGET", 0)
+    monkeypatch.setitem(app.config, "QUERY_BUDGET_RAISE", False)
+
+    assert client.get("/user/", headers=auth_header(user_id=user_id), json={}).status_code == 200
+
+
+@pytest.mark.parametrize("limit", [5, 50])
+def test_company_users_query_count_is_constant(app, client, make_user, make_company, make_role, auth_header,
+                                               statements, limit):
+    owner_id = make_user("owner@example.com")
+    company_id = make_company("acme")
+    role_id = make_role(owner_id, company_id)
+    _add_members(app, company_id, 50)
+    statements.clear()
+
+    response = client.get(
+        f"/company/users?limit={limit}", headers=auth_header(user_id=owner_id, role_id=role_id), json={}
+    )
+
+    assert response.status_code == 200
+    assert len(response.json["payload"]["users"]) == limit
+    assert 0 < len(statements) <= 3
+
+
+@pytest.mark.parametrize("limit", [5, 50])
+def test_user_companies_query_count_is_constant(app, client, make_user, auth_header, statements, limit):
+    user_id = make_user("ana@example.com")
+    _add_companies(app, user_id, 50)
+    statements.clear()
+
+    response = client.get(f"/user/companies?limit={limit}", headers=auth_header(user_id=user_id), json={})
+
+    assert response.status_code == 200
+    assert len(response.json["payload"]["companies"]) == limit
+    assert 0 < len(statements) <= 3
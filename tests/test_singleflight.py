@@ -0,0 +1,68 @@
+import threading, time
+import pytest
+from api.services.singleflight_service import SingleFlight
+
+
+def _run_concurrently(app, key: str, fn) -> dict:
+    """the leader runs 'fn' until a follower is waiting on the same key"""
+    release, results = threading.Event(), {}
+
+    def leader_fn():
+        release.wait(5)
+        return fn()
+
+    def call(name, view):
+        with app.app_context():
+            try:
+                results[name] = SingleFlight.do(key, view)
+            except Exception as e:
+                results[name] = e
+
+    leader = threading.Thread(target=call, args=("leader", leader_fn))
+    leader.start()
+    while key not in SingleFlight.calls:
+        time.sleep(0.01)
+    follower = threading.Thread(target=call, args=("follower", fn))
+    follower.start()
+    time.sleep(0.2)  # the follower is waiting for the leader
+    release.set()
+    leader.join()
+    follower.join()
+    return results
+
+
+def test_follower_gets_the_leader_response(app):
+    runs = []
+
+    def view():
+        runs.append(1)
+        return {"value": len(runs)}, 200
+
+    results = _run_concurrently(app, "same-key", view)
+
+    assert runs == [1]
+    assert results["follower"].get_data() == results["leader"].get_data()
+    assert results["follower"].status_code == 200
+    assert results["follower"].headers[SingleFlight.SHARED_HEADER] == "flight"
+    assert SingleFlight.SHARED_HEADER not in results["leader"].headers
+    assert "same-key" not in SingleFlight.calls
+
+
+def test_leader_error_reaches_followers(app):
+    runs = []
+
+    def view():
+        runs.append(1)
+        raise ValueError("db is down")
+
+    results = _run_concurrently(app, "failing-key", view)
+
+    assert runs == [1]
+    assert isinstance(results["leader"], ValueError)
+    assert results["follower"] is results["leader"]
+    assert "failing-key" not in SingleFlight.calls
+
+    with app.app_context():  # the key is released, the next request runs the view again
+        with pytest.raises(ValueError):
+            SingleFlight.do("failing-key", view)
+    assert runs == [1, 1]
@@ -0,0 +1,126 @@
+import os, shutil
+import pytest
+from werkzeug.exceptions import NotFound
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+from werkzeug.test import Client
+from middlewares.compression import CompressionMiddleware, brotli
+from middlewares.precompress import ENCODING_EXTENSIONS, precompress_directory
+from middlewares.static_files import StaticIndex
+
+ASSET = "/app/static/js/main.7b61e890.js"
+
+
+def _cache_control(response) -> set[str]:
+    return {d.strip() for d in response.headers["Cache-Control"].split(",")}
+
+
+def test_hashed_asset_is_immutable(dispatcher_client):
+    response = dispatcher_client.get(ASSET)
+
+    assert response.status_code == 200
+    assert response.mimetype in ("application/javascript", "text/javascript")
+    assert _cache_control(response) == {"public", "max-age=31536000", "immutable"}
+
+
+def test_manifest_file_without_hash_in_name_is_immutable(dispatcher_client):
+    response = dispatcher_client.get("/app/static/css/main.073c9b0a.css.map")
+
+    assert "immutable" in _cache_control(response)
+
+
+def test_unhashed_file_is_revalidated_hourly(dispatcher_client):
+    response = dispatcher_client.get("/app/robots.txt")
+
+    assert response.status_code == 200
+    assert _cache_control(response) == {"public", "max-age=3600"}
+
+
+@pytest.mark.parametrize("path", ["/app/", "/app/index.html", "/app/inventory/items/12", "/app/static/js/missing.js"])
+def test_index_and_spa_routes(dispatcher_client, path):
+    index = dispatcher_client.get("/app/index.html")
+    response = dispatcher_client.get(path)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/html"
+    assert response.get_data() == index.get_data()
+    assert "no-cache" in _cache_control(response)
+    assert "immutable" not in _cache_control(response)
+    assert response.headers["ETag"] == index.headers["ETag"]
+
+
+@pytest.mark.parametrize("path", [ASSET, "/app/", "/app/inventory"])
+def test_conditional_request(dispatcher_client, path):
+    etag = dispatcher_client.get(path).headers["ETag"]
+    response = dispatcher_client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+@pytest.fixture(scope="module")
+def precompressed_build(tmp_path_factory):
+    """copy of the frontend build precompressed with middlewares.precompress (the repo build has none)"""
+    import frontend_app
+
+    build = tmp_path_factory.mktemp("frontend") / "build"
+    shutil.copytree(os.path.join(frontend_app.__path__[0], "build"), build)
+    written = precompress_directory(str(build))
+    assert str(build / "static/js/main.7b61e890.js.gz") in written
+    return build
+
+
+@pytest.fixture
+def precompressed_client(precompressed_build, monkeypatch):
+    """dispatcher stack with a frontend app serving the precompressed build"""
+    import frontend_app
+
+    monkeypatch.setattr(
+        frontend_app, "StaticIndex", lambda root, url_prefix: StaticIndex(str(precompressed_build), url_prefix)
+    )
+    app = frontend_app.create_app()
+
+    def client(**config):
+        app.config.update(config)
+        return Client(CompressionMiddleware(DispatcherMiddleware(NotFound(), {"/app": app})))
+
+    return precompressed_build, client
+
+
+@pytest.mark.parametrize("accept, encoding", [("gzip", "gzip"), ("br, gzip", "br" if brotli else "gzip")])
+def test_precompressed_variant_is_served(precompressed_client, accept, encoding):
+    build, client = precompressed_client
+    plain = client().get(ASSET)
+    response = client().get(ASSET, headers={"Accept-Encoding": accept})
+
+    variant = build / f"static/js/main.7b61e890.js{ENCODING_EXTENSIONS[encoding]}"
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.get_data() == variant.read_bytes()  # the file on disk, not compressed again
+    assert response.headers["ETag"] == plain.headers["ETag"][:-1] + f'-{encoding}"'
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert "immutable" in _cache_control(response)
+
+    etag = response.headers["ETag"]
+    assert client().get(ASSET, headers={"Accept-Encoding": accept, "If-None-Match": etag}).status_code == 304
+
+
+def test_stale_variant_is_ignored(precompressed_build):
+    rel_path = "static/js/787.f96fd8b5.chunk.js"
+    source = precompressed_build / rel_path
+    assert set(StaticIndex(str(precompressed_build)).get(rel_path).variants) == set(ENCODING_EXTENSIONS) - (
+        set() if brotli else {"br"}
+    )
+    for extension in ENCODING_EXTENSIONS.values():
+        variant = source.with_name(source.name + extension)
+        if variant.exists():
+            os.utime(variant, (0, 0))  # older than the file, from a previous build
+
+    assert StaticIndex(str(precompressed_build)).get(rel_path).variants == {}
+
+
+def test_accel_redirect(precompressed_client):
+    _, client = precompressed_client
+    response = client(STATIC_ACCEL_REDIRECT="/_static/app/").get(ASSET, headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["X-Accel-Redirect"] == "/_static/app/static/js/main.7b61e890.js.gz"
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.get_data() == b""
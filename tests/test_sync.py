@@ -0,0 +1,125 @@
+import pytest
+from api.extensions import db
+from api.models.main import ChangeFeed, Role
+from api.services import changefeed_service as feed
+from api.utils.enums import AccessLevel, OperationStatus
+
+
+@pytest.fixture
+def company(make_user, make_company, make_role, auth_header):
+    """owner (admin token) and a member with an accepted invitation"""
+    owner_id = make_user("owner@example.com")
+    member_id = make_user("member@example.com")
+    company_id = make_company("acme")
+    owner_role = make_role(owner_id, company_id)
+    member_role = make_role(member_id, company_id, access_level=AccessLevel.OPERATOR.value)
+    return {
+        "id": company_id,
+        "owner": auth_header(user_id=owner_id, role_id=owner_role),
+        "member": auth_header(user_id=member_id),
+        "member_id": member_id,
+        "member_role": member_role,
+    }
+
+
+def _sync(client, headers, since=0):
+    return client.get(f"/sync/?since={since}", headers=headers, json={})
+
+
+def _changes(response) -> list[tuple]:
+    assert response.status_code == 200
+    return [(c["entity"], c["id"], c["op"]) for c in response.json["payload"]["changes"]]
+
+
+def test_sync_returns_changes_after_cursor(client, company):
+    cursor = _sync(client, company["owner"]).json["payload"]["cursor"]
+    client.put("/company/", json={"tz_name": "utc"}, headers=company["owner"])
+
+    response = _sync(client, company["member"], since=cursor)
+
+    assert _changes(response) == [("company", company["id"], "upsert")]
+    assert response.json["payload"]["cursor"] > cursor
+    assert _changes(_sync(client, company["member"], since=response.json["payload"]["cursor"])) == []
+
+
+def test_admin_gets_member_changes_merged(client, company):
+    client.put("/user/", json={"first_name": "maria"}, headers=company["member"])
+    client.put("/user/", json={"first_name": "marta"}, headers=company["member"])
+
+    changes = _sync(client, company["owner"]).json["payload"]["changes"]
+    users = [c for c in changes if c["entity"] == "user"]
+
+    assert len(users) == 1
+    assert users[0]["data"]["first_name"] == "marta"
+
+
+def test_rejected_invitation_gets_no_company_changes(app, client, make_user, make_role, auth_header, company):
+    guest_id = make_user("guest@example.com")
+    guest_role = make_role(
+        guest_id, company["id"], access_level=AccessLevel.OPERATOR.value, status=OperationStatus.REJECTED.value
+    )
+    with app.app_context():
+        feed.record_role(db.session.get(Role, guest_role))
+        db.session.commit()
+    client.put("/company/", json={"tz_name": "utc"}, headers=company["owner"])
+
+    changes = _changes(_sync(client, auth_header(user_id=guest_id)))
+
+    assert changes == [("role", guest_role, "upsert")]
+
+
+def test_deleted_role_is_a_tombstone(app, client, company):
+    cursor = _sync(client, company["owner"]).json["payload"]["cursor"]
+    with app.app_context():
+        role = db.session.get(Role, company["member_role"])
+        feed.record_role(role, op="delete")
+        db.session.delete(role)
+        db.session.commit()
+
+    changes = _sync(client, company["owner"], since=cursor).json["payload"]["changes"]
+
+    assert changes == [
+        {"seq": changes[0]["seq"], "entity": "role", "id": company["member_role"], "op": "delete", "data": None}
+    ]
+
+
+def test_sync_pages(app, client, company, monkeypatch):
+    monkeypatch.setitem(app.config, "SYNC_PAGE_SIZE", 1)
+    client.put("/company/", json={"tz_name": "utc"}, headers=company["owner"])
+    client.put("/user/", json={"first_name": "Maria"}, headers=company["member"])
+
+    seen, cursor, has_more = [], 0, True
+    while has_more:
+        payload = _sync(client, company["owner"], since=cursor).json["payload"]
+        assert len(payload["changes"]) <= 1
+        seen += [c["entity"] for c in payload["changes"]]
+        cursor, has_more = payload["cursor"], payload["has_more"]
+
+    assert seen == ["company", "user"]
+
+
+def test_expired_cursor(app, client, company):
+    for _ in range(3):
+        client.put("/company/", json={"tz_name": "utc"}, headers=company["owner"])
+    with app.app_context():
+        oldest = db.session.query(db.func.min(ChangeFeed.id)).scalar()
+        db.session.query(ChangeFeed).filter(ChangeFeed.id <= oldest + 1).delete()
+        db.session.commit()
+
+    assert _sync(client, company["owner"], since=oldest).status_code == 410
+    assert _sync(client, company["owner"], since=oldest + 1).status_code == 200
+
+
+def test_placeholder_signup_is_recorded(app, client, make_user, make_role, auth_header, company):
+    guest_id = make_user("guest@example.com", signup_completed=False)
+    make_role(guest_id, company["id"], access_level=AccessLevel.OPERATOR.value, status=OperationStatus.PENDING.value)
+    cursor = _sync(client, company["owner"]).json["payload"]["cursor"]
+
+    response = client.post(
+        "/auth/signup",
+        json={"password": "Password123*", "re_password": "Password123*", "first_name": "Gus", "last_name": "Lopez"},
+        headers=auth_header(email="guest@example.com", verified=True),
+    )
+    assert response.status_code == 201
+
+    assert _changes(_sync(client, company["owner"], since=cursor)) == [("user", guest_id, "upsert")]
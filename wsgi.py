@@ -0,0 +1,6 @@
+"""
+production entry point:
+    gunicorn wsgi:application   (settings in gunicorn.conf.py)
+dispatcher.py run_simple (reloader and debugger) is only for development.
+"""
+from dispatcher import application  # noqa: F401